@@ -1,16 +1,23 @@
+import time
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
 from ..db.session import get_pool
-from .security import decode_access_token
+from ..metrics import auth_seconds
+from .security import authenticate_token
 
 _security = HTTPBearer(auto_error=False)
 
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(_security)) -> str:
+# async: проверка токена дешевая (обычно попадание в кэш), поэтому выполняется прямо в event loop,
+# без переключения в threadpool, которое FastAPI делает для sync-зависимостей
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(_security)) -> str:
     if credentials is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing credentials")
-    subject = decode_access_token(credentials.credentials)
+    started = time.perf_counter()
+    subject = authenticate_token(credentials.credentials)
+    auth_seconds.observe(("ok" if subject is not None else "rejected",), time.perf_counter() - started)
     if subject is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or expired token")
     return subject
@@ -1,5 +1,11 @@
+import asyncio
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Callable, Dict, Optional, Tuple, TypeVar
 
 import bcrypt
 from jose import JWTError, jwt
@@ -8,12 +14,13 @@ from ..config import get_settings
 
 
 settings = get_settings()
+T = TypeVar("T")
 
 
 def hash_password(password: str) -> str:
     """Хеширует пароль с использованием bcrypt"""
     password_bytes = password.encode('utf-8')
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=settings.bcrypt_rounds)
     hashed = bcrypt.hashpw(password_bytes, salt)
     return hashed.decode('utf-8')
 
@@ -25,6 +32,49 @@ def verify_password(password: str, hashed: str) -> bool:
     return bcrypt.checkpw(password_bytes, hashed_bytes)
 
 
+def needs_rehash(hashed: str) -> bool:
+    """True, если хеш создан с другой стоимостью bcrypt, чем настроена сейчас"""
+    try:
+        return int(hashed.split("$")[2]) != settings.bcrypt_rounds
+    except (IndexError, ValueError):
+        return True
+
+
+class PasswordHashingBusy(Exception):
+    """Очередь на хеширование паролей переполнена дольше допустимого ожидания"""
+
+
+# Отдельный ограниченный пул для bcrypt: шторм логинов не занимает общий threadpool,
+# который нужен sync-обработчикам и проксированию
+_hash_executor = ThreadPoolExecutor(max_workers=settings.password_hash_workers, thread_name_prefix="bcrypt")
+_hash_slots = asyncio.Semaphore(settings.password_hash_workers)
+
+
+async def _run_hashing(fn: Callable[..., T], *args) -> T:
+    try:
+        await asyncio.wait_for(_hash_slots.acquire(), timeout=settings.password_hash_max_wait_seconds)
+    except asyncio.TimeoutError:
+        raise PasswordHashingBusy()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_hash_executor, fn, *args)
+    finally:
+        _hash_slots.release()
+
+
+async def hash_password_async(password: str) -> str:
+    """hash_password в выделенном пуле; PasswordHashingBusy, если ожидание в очереди слишком долгое"""
+    return await _run_hashing(hash_password, password)
+
+
+async def verify_password_async(password: str, hashed: str) -> bool:
+    """verify_password в выделенном пуле; PasswordHashingBusy, если ожидание в очереди слишком долгое"""
+    return await _run_hashing(verify_password, password, hashed)
+
+
+def shutdown_password_hasher() -> None:
+    _hash_executor.shutdown(wait=False, cancel_futures=True)
+
+
 def create_access_token(subject: str, expires_delta: Optional[timedelta] = None) -> str:
     expire = datetime.now(timezone.utc) + (expires_delta or timedelta(hours=settings.jwt_expire_hours))
     payload = {"sub": subject, "exp": expire}
@@ -37,3 +87,110 @@ def decode_access_token(token: str) -> Optional[str]:
         return payload.get("sub")
     except JWTError:
         return None
+
+
+class VerifiedTokenCache:
+    """
+    LRU уже проверенных токенов: sha256(токен) -> (subject, exp).
+
+    Повторный запрос с тем же токеном не повторяет проверку подписи и разбор claims.
+    Запись перестает действовать ровно в момент exp токена. Отозванные токены
+    (``revoke``) хранятся до своего exp и отклоняются даже при валидной подписи.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[bytes, Tuple[str, float]]" = OrderedDict()
+        self._revoked: Dict[bytes, float] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _digest(token: str) -> bytes:
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    def get(self, token: str) -> Optional[str]:
+        digest = self._digest(token)
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                self.misses += 1
+                return None
+            subject, exp = entry
+            if time.time() >= exp:
+                del self._entries[digest]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(digest)
+            self.hits += 1
+            return subject
+
+    def put(self, token: str, subject: str, exp: float) -> None:
+        if self._max_entries <= 0:
+            return
+        digest = self._digest(token)
+        with self._lock:
+            self._entries[digest] = (subject, exp)
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def revoke(self, token: str, exp: float) -> None:
+        digest = self._digest(token)
+        now = time.time()
+        with self._lock:
+            self._entries.pop(digest, None)
+            self._revoked[digest] = exp
+            # Истекшие токены отклонит и сама проверка exp — держать их в наборе незачем
+            for expired in [key for key, until in self._revoked.items() if until <= now]:
+                del self._revoked[expired]
+
+    def is_revoked(self, token: str) -> bool:
+        return self._digest(token) in self._revoked
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_token_cache = VerifiedTokenCache(settings.jwt_cache_max_entries)
+
+
+def token_cache_stats() -> Dict[str, int]:
+    return {"hits": _token_cache.hits, "misses": _token_cache.misses}
+
+
+def _decode_claims(token: str) -> Optional[Tuple[str, float]]:
+    try:
+        payload = jwt.decode(token, settings.jwt_secret, algorithms=["HS256"])
+    except JWTError:
+        return None
+    subject = payload.get("sub")
+    if subject is None:
+        return None
+    return subject, float(payload.get("exp", 0))
+
+
+def authenticate_token(token: str) -> Optional[str]:
+    """decode_access_token с кэшем уже проверенных токенов и учетом отзыва"""
+    if _token_cache.is_revoked(token):
+        return None
+    subject = _token_cache.get(token)
+    if subject is not None:
+        return subject
+    claims = _decode_claims(token)
+    if claims is None:
+        return None
+    subject, exp = claims
+    _token_cache.put(token, subject, exp)
+    return subject
+
+
+def revoke_access_token(token: str) -> bool:
+    """Отозвать токен до истечения его срока; False, если токен и так недействителен"""
+    claims = _decode_claims(token)
+    if claims is None:
+        return False
+    _token_cache.revoke(token, claims[1])
+    return True
@@ -0,0 +1,188 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from .metrics import observe_upstream
+
+logger = logging.getLogger(__name__)
+
+
+def split_urls(value: str) -> List[str]:
+    """Список реплик из строки настроек: URL через запятую"""
+    return [url.strip().rstrip("/") for url in value.split(",") if url.strip()]
+
+
+class _Replica:
+    __slots__ = ("url", "prefix", "outstanding", "healthy", "failures")
+
+    def __init__(self, url: str):
+        self.url = httpx.URL(url)
+        # Базовый путь реплики (например, /lab1 за обратным прокси), без завершающего "/"
+        self.prefix = self.url.raw_path.split(b"?", 1)[0].rstrip(b"/")
+        self.outstanding = 0
+        self.healthy = True
+        self.failures = 0
+
+
+class _TrackedStream(httpx.AsyncByteStream):
+    """Тело ответа, при закрытии которого запрос перестает считаться незавершенным"""
+
+    def __init__(self, stream: httpx.AsyncByteStream, replica: _Replica):
+        self._stream = stream
+        self._replica: Optional[_Replica] = replica
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        if self._replica is not None:
+            self._replica.outstanding -= 1
+            self._replica = None
+        await self._stream.aclose()
+
+
+class BalancedTransport(httpx.AsyncBaseTransport):
+    """
+    Балансировка запросов между репликами одного upstream.
+
+    Запрос уходит на здоровую реплику с наименьшим числом незавершенных запросов
+    (запрос считается незавершенным, пока не закрыто тело ответа). Реплика исключается
+    после ``eject_after`` сетевых ошибок подряд или неуспешной проверки ``health_path``
+    и возвращается после успешной проверки (без ``health_path`` — через ``health_interval``).
+    Если здоровых реплик нет, используются все.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        urls: List[str],
+        inner: httpx.AsyncBaseTransport,
+        health_path: Optional[str] = None,
+        health_interval: float = 5.0,
+        eject_after: int = 3,
+    ):
+        if not urls:
+            raise ValueError(f"No replica URLs configured for {name}")
+        self.name = name
+        self._replicas = [_Replica(url) for url in urls]
+        self._inner = inner
+        self._health_path = health_path
+        self._health_interval = health_interval
+        self._eject_after = eject_after
+        self._next = 0
+        self._health_task: Optional[asyncio.Task] = None
+
+    @property
+    def base_url(self) -> str:
+        return str(self._replicas[0].url)
+
+    def _pick(self) -> _Replica:
+        candidates = [replica for replica in self._replicas if replica.healthy] or self._replicas
+        # Начинаем с разных реплик по кругу, чтобы при равной загрузке не выбирать всегда первую
+        self._next = (self._next + 1) % len(candidates)
+        rotated = candidates[self._next:] + candidates[:self._next]
+        return min(rotated, key=lambda replica: replica.outstanding)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        replica = self._pick()
+        # Клиент строит URL от base_url первой реплики: ее базовый путь заменяется базовым путем выбранной.
+        # Повторы и hedge-запросы передают тот же объект Request, поэтому исходный относительный путь
+        # запоминается при первом проходе, и URL всегда строится от него, а не от уже переписанного
+        raw_path = request.extensions.get("balancer_path")
+        if raw_path is None:
+            raw_path = request.url.raw_path
+            base = self._replicas[0].prefix
+            if base and raw_path.startswith(base):
+                raw_path = raw_path[len(base):]
+            request.extensions["balancer_path"] = raw_path
+        request.url = request.url.copy_with(
+            scheme=replica.url.scheme,
+            host=replica.url.host,
+            port=replica.url.port,
+            raw_path=replica.prefix + raw_path,
+        )
+        request.headers["Host"] = replica.url.netloc.decode("ascii")
+
+        replica.outstanding += 1
+        started = time.perf_counter()
+        try:
+            response = await self._inner.handle_async_request(request)
+        except BaseException as exc:
+            replica.outstanding -= 1
+            if isinstance(exc, httpx.TransportError):
+                self._mark_failure(replica, str(exc))
+                observe_upstream(self.name, None, time.perf_counter() - started)
+            raise
+        observe_upstream(self.name, response.status_code, time.perf_counter() - started)
+        replica.failures = 0
+        response.stream = _TrackedStream(response.stream, replica)
+        return response
+
+    def _mark_failure(self, replica: _Replica, reason: str) -> None:
+        replica.failures += 1
+        if replica.failures >= self._eject_after:
+            self._eject(replica, reason)
+
+    def _eject(self, replica: _Replica, reason: str) -> None:
+        if replica.healthy:
+            replica.healthy = False
+            logger.warning("%s replica %s ejected: %s", self.name, replica.url, reason)
+            if self._health_task is None:
+                # Без активных проверок возвращаем реплику по таймауту — следующий запрос станет пробой
+                asyncio.get_running_loop().call_later(self._health_interval, self._mark_healthy, replica)
+
+    def _mark_healthy(self, replica: _Replica) -> None:
+        replica.failures = 0
+        if not replica.healthy:
+            replica.healthy = True
+            logger.info("%s replica %s re-admitted", self.name, replica.url)
+
+    async def start(self) -> None:
+        if self._health_path and len(self._replicas) > 1 and self._health_task is None:
+            self._health_task = asyncio.create_task(self._health_loop())
+
+    async def _health_loop(self) -> None:
+        async with httpx.AsyncClient(timeout=min(self._health_interval, 2.0)) as client:
+            while True:
+                await asyncio.gather(*(self._check(client, replica) for replica in self._replicas))
+                await asyncio.sleep(self._health_interval)
+
+    async def _check(self, client: httpx.AsyncClient, replica: _Replica) -> None:
+        try:
+            response = await client.get(
+                replica.url.copy_with(raw_path=replica.prefix + b"/" + self._health_path.lstrip("/").encode("ascii"))
+            )
+        except httpx.HTTPError as exc:
+            self._eject(replica, f"health check failed: {exc}")
+            return
+        if response.status_code >= 500:
+            self._eject(replica, f"health check returned {response.status_code}")
+        else:
+            self._mark_healthy(replica)
+
+    def pool_stats(self) -> Dict[str, int]:
+        """Соединения httpx-пула: всего и простаивающих (пул общий для всех реплик)"""
+        pool = getattr(self._inner, "_pool", None)
+        connections = list(getattr(pool, "connections", []))
+        idle = sum(1 for connection in connections if connection.is_idle())
+        return {"active": len(connections) - idle, "idle": idle}
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [
+            {"url": str(replica.url), "healthy": replica.healthy, "outstanding": replica.outstanding}
+            for replica in self._replicas
+        ]
+
+    async def aclose(self) -> None:
+        if self._health_task is not None:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except asyncio.CancelledError:
+                pass
+            self._health_task = None
+        await self._inner.aclose()
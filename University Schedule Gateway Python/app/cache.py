@@ -0,0 +1,165 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Mapping, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+CacheKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+@dataclass
+class _Entry:
+    value: Any
+    fresh_until: float
+    stale_until: float
+
+
+class ResponseCache:
+    """
+    Кэш ответов upstream-сервисов в памяти gateway.
+
+    - Ключ — имя маршрута и нормализованные (отсортированные, приведенные к строке) параметры.
+    - Пока запись свежая (``ttl``), отдается без обращения к upstream. В течение ``stale_ttl``
+      после этого отдается устаревшее значение, а обновление идет в фоне (stale-while-revalidate).
+    - Одинаковые запросы, пришедшие во время загрузки, ждут один общий upstream-вызов.
+    - Размер ограничен ``max_entries``, вытесняются давно не использованные записи (LRU).
+    - ``purge`` сбрасывает кэш; результаты загрузок, начатых до сброса, не сохраняются.
+    """
+
+    def __init__(self, max_entries: int = 512):
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[CacheKey, _Entry]" = OrderedDict()
+        self._inflight: Dict[CacheKey, asyncio.Task] = {}
+        # Все незавершенные загрузки, включая отвязанные от ключа сбросом кэша
+        self._tasks: Set[asyncio.Task] = set()
+        # Поколения: общее (сброс всего кэша) и по маршрутам (сброс одного маршрута)
+        self._generation = 0
+        self._route_generations: Dict[str, int] = {}
+        self._stats = {"hits": 0, "stale_hits": 0, "misses": 0, "coalesced": 0, "evictions": 0, "purges": 0}
+
+    @staticmethod
+    def make_key(route: str, params: Mapping[str, Any]) -> CacheKey:
+        return route, tuple(sorted((str(name), str(value)) for name, value in params.items()))
+
+    async def get_or_fetch(
+        self,
+        route: str,
+        params: Mapping[str, Any],
+        fetch: Callable[[], Awaitable[Any]],
+        ttl: float,
+        stale_ttl: float = 0.0,
+    ) -> Any:
+        """Вернуть значение из кэша или загрузить его через ``fetch``; ``ttl <= 0`` отключает кэш"""
+        if ttl <= 0:
+            return await fetch()
+
+        key = self.make_key(route, params)
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry is not None:
+            if now < entry.fresh_until:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return entry.value
+            if now < entry.stale_until:
+                self._entries.move_to_end(key)
+                self._stats["stale_hits"] += 1
+                if key not in self._inflight:
+                    self._start_load(key, fetch, ttl, stale_ttl).add_done_callback(self._log_refresh_error)
+                return entry.value
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self._stats["coalesced"] += 1
+        else:
+            self._stats["misses"] += 1
+            task = self._start_load(key, fetch, ttl, stale_ttl)
+        # shield: отключившийся клиент не отменяет загрузку, которую ждут остальные
+        return await asyncio.shield(task)
+
+    def _start_load(self, key: CacheKey, fetch: Callable[[], Awaitable[Any]], ttl: float, stale_ttl: float) -> asyncio.Task:
+        generation = self._generation_of(key[0])
+
+        async def load() -> Any:
+            try:
+                value = await fetch()
+                if generation == self._generation_of(key[0]):
+                    self._store(key, value, ttl, stale_ttl)
+                return value
+            finally:
+                if self._inflight.get(key) is task:
+                    del self._inflight[key]
+
+        task = asyncio.create_task(load())
+        self._inflight[key] = task
+        self._tasks.add(task)
+        task.add_done_callback(self._on_load_done)
+        return task
+
+    def _on_load_done(self, task: asyncio.Task) -> None:
+        # Ошибку читаем всегда: все ожидавшие клиенты могли отключиться (shield),
+        # и тогда asyncio сообщил бы "Task exception was never retrieved"
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.debug("Cache load failed: %s", task.exception())
+
+    @staticmethod
+    def _log_refresh_error(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("Background cache refresh failed: %s", task.exception())
+
+    def _store(self, key: CacheKey, value: Any, ttl: float, stale_ttl: float) -> None:
+        now = time.monotonic()
+        self._entries[key] = _Entry(value=value, fresh_until=now + ttl, stale_until=now + ttl + max(stale_ttl, 0.0))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def _generation_of(self, route: str) -> Tuple[int, int]:
+        return self._generation, self._route_generations.get(route, 0)
+
+    def purge(self, route: Optional[str] = None) -> int:
+        """Удалить все записи (или записи одного маршрута); возвращает число удаленных"""
+        if route is None:
+            removed = len(self._entries)
+            self._entries.clear()
+            # Новые запросы не должны присоединяться к загрузкам, начатым до сброса
+            self._inflight.clear()
+            self._generation += 1
+        else:
+            keys = [key for key in self._entries if key[0] == route]
+            for key in keys:
+                del self._entries[key]
+            removed = len(keys)
+            for key in [key for key in self._inflight if key[0] == route]:
+                del self._inflight[key]
+            # Результаты загрузок других маршрутов остаются действительными
+            self._route_generations[route] = self._route_generations.get(route, 0) + 1
+        self._stats["purges"] += 1
+        return removed
+
+    def stats(self) -> Dict[str, int]:
+        return {**self._stats, "entries": len(self._entries), "max_entries": self._max_entries}
+
+    async def close(self) -> None:
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+_response_cache: Optional[ResponseCache] = None
+
+
+def configure_response_cache(cache: Optional[ResponseCache]) -> None:
+    global _response_cache
+    _response_cache = cache
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    return _response_cache
@@ -9,10 +9,46 @@ class Settings(BaseSettings):
     postgres_dsn: str = Field(..., description="PostgreSQL connection string for auth storage")
     jwt_secret: str = Field(..., description="JWT signing secret")
     jwt_expire_hours: int = Field(12, description="Token lifetime in hours")
-    lab1_service_url: str = Field(..., description="Base URL of the Lab1 service")
-    lab2_service_url: str = Field("http://python-lab2:8080", description="Base URL of the Lab2 service")
-    lab3_service_url: str = Field("http://python-lab3:8080", description="Base URL of the Lab3 service")
-    generator_service_url: str = Field("http://csharp-generator:8080", description="Base URL of the Generator service")
+    jwt_cache_max_entries: int = Field(10000, description="Verified JWTs kept in the auth LRU (0 disables the cache)")
+    bcrypt_rounds: int = Field(12, ge=4, le=31, description="bcrypt cost factor; existing hashes are upgraded on next login")
+    password_hash_workers: int = Field(2, ge=1, description="Threads dedicated to bcrypt hashing")
+    password_hash_max_wait_seconds: float = Field(2.0, description="Max time a request may wait for a hashing slot before getting 503")
+    lab1_service_url: str = Field(..., description="Base URL of the Lab1 service; several replicas may be given comma-separated")
+    lab2_service_url: str = Field("http://python-lab2:8080", description="Base URL of the Lab2 service; several replicas may be given comma-separated")
+    lab3_service_url: str = Field("http://python-lab3:8080", description="Base URL of the Lab3 service; several replicas may be given comma-separated")
+    generator_service_url: str = Field("http://csharp-generator:8080", description="Base URL of the Generator service; several replicas may be given comma-separated")
+    lab1_health_path: str = Field("/healthz", description="Lab1 health endpoint used to eject/re-admit replicas")
+    lab2_health_path: str = Field("/health", description="Lab2 health endpoint used to eject/re-admit replicas")
+    lab3_health_path: str = Field("/", description="Lab3 health endpoint used to eject/re-admit replicas")
+    generator_health_path: str = Field("", description="Generator health endpoint (empty: only passive ejection)")
+    replica_health_interval_seconds: float = Field(5.0, description="Interval between replica health checks")
+    replica_eject_after_failures: int = Field(3, description="Consecutive connection failures that eject a replica")
+    lab1_timeout_seconds: float = Field(30.0, description="Read/write timeout for Lab1 requests")
+    lab2_timeout_seconds: float = Field(30.0, description="Read/write timeout for Lab2 requests")
+    lab3_timeout_seconds: float = Field(30.0, description="Read/write timeout for Lab3 requests")
+    generator_timeout_seconds: float = Field(300.0, description="Read/write timeout for Generator requests")
+    upstream_connect_timeout_seconds: float = Field(3.0, description="TCP connect timeout for every upstream")
+    lab1_max_connections: int = Field(50, description="Connection pool limit for Lab1")
+    lab2_max_connections: int = Field(50, description="Connection pool limit for Lab2")
+    lab3_max_connections: int = Field(50, description="Connection pool limit for Lab3")
+    generator_max_connections: int = Field(10, description="Connection pool limit for the Generator")
+    circuit_breaker_failure_threshold: int = Field(5, description="Consecutive upstream failures that open the circuit")
+    circuit_breaker_reset_seconds: float = Field(15.0, description="How long an open circuit rejects requests before a probe")
+    retry_max_attempts: int = Field(2, description="Max retries of an idempotent upstream request")
+    retry_budget_ratio: float = Field(0.2, description="Retries (and hedges) allowed per upstream request")
+    retry_budget_min_per_second: float = Field(1.0, description="Retries always allowed per second regardless of traffic")
+    hedging_enabled: bool = Field(False, description="Send a second copy of a GET that has not answered within the observed p95")
+    hedging_min_samples: int = Field(50, description="Latency samples required before hedging starts")
+    response_cache_enabled: bool = Field(True, description="Cache Lab1/Lab2/Lab3 report responses in the gateway")
+    response_cache_max_entries: int = Field(512, description="Maximum number of cached responses (LRU eviction)")
+    response_cache_stale_seconds: float = Field(300.0, description="How long an expired response may still be served while it is refreshed in the background")
+    lab1_cache_ttl_seconds: float = Field(60.0, description="Lab1 response TTL in seconds (0 disables caching)")
+    lab2_cache_ttl_seconds: float = Field(60.0, description="Lab2 response TTL in seconds (0 disables caching)")
+    lab3_cache_ttl_seconds: float = Field(60.0, description="Lab3 response TTL in seconds (0 disables caching)")
+    dashboard_lab1_timeout_seconds: float = Field(10.0, description="Time budget of the Lab1 leg of /dashboard")
+    dashboard_lab2_timeout_seconds: float = Field(10.0, description="Time budget of the Lab2 leg of /dashboard")
+    dashboard_lab3_timeout_seconds: float = Field(10.0, description="Time budget of the Lab3 leg of /dashboard")
+    streaming_proxy_enabled: bool = Field(True, description="Stream upstream response bytes instead of parsing and re-serializing JSON")
     cors_origins: List[str] = Field(default_factory=lambda: ["http://localhost", "http://localhost:8000", "https://localhost:7249"], description="Allowed CORS origins")
 
     model_config = SettingsConfigDict(env_prefix="GATEWAY_", case_sensitive=False)
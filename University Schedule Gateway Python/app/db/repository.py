@@ -15,6 +15,12 @@ class UserRepository:
             with conn.cursor() as cur:
                 cur.execute(query, (name, password_hash))
 
+    def update_password_hash(self, user_id: int, password_hash: str) -> None:
+        query = "UPDATE users SET password_hash = %s WHERE id = %s"
+        with self._pool.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(query, (password_hash, user_id))
+
     def get_by_name(self, name: str) -> Optional[dict]:
         query = "SELECT id, name, password_hash FROM users WHERE name = %s"
         with self._pool.connection() as conn:
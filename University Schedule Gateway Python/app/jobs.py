@@ -0,0 +1,118 @@
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from fastapi import HTTPException
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    status: str = "running"
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    result: Any = None
+    error: Optional[Dict[str, Any]] = None
+    _started: float = field(default_factory=time.monotonic, repr=False)
+    _elapsed: Optional[float] = field(default=None, repr=False)
+
+    @property
+    def active(self) -> bool:
+        return self.status == "running"
+
+    def to_dict(self) -> Dict[str, Any]:
+        elapsed = self._elapsed if self._elapsed is not None else time.monotonic() - self._started
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "elapsed_seconds": round(elapsed, 3),
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class JobConflict(Exception):
+    """Уже выполняется другая задача, изменяющая данные"""
+
+    def __init__(self, active: Job):
+        super().__init__(f"Job {active.id} ({active.kind}) is still running")
+        self.active = active
+
+
+class JobManager:
+    """
+    Фоновые задачи генерации и очистки данных.
+
+    Одновременно выполняется не более одной задачи: генерация и очистка изменяют одни
+    и те же базы. Завершенные задачи хранятся (не более ``history``), чтобы клиент мог
+    забрать результат через ``GET /api/v1/jobs/{id}`` в любой момент.
+    """
+
+    def __init__(self, history: int = 100):
+        self._history = history
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._active: Optional[Job] = None
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def submit(self, kind: str, run: Callable[[], Awaitable[Any]], on_finish: Optional[Callable[[], None]] = None) -> Job:
+        if self._active is not None and self._active.active:
+            raise JobConflict(self._active)
+        job = Job(id=uuid.uuid4().hex, kind=kind)
+        self._active = job
+        self._jobs[job.id] = job
+        while len(self._jobs) > self._history:
+            oldest = next(iter(self._jobs.values()))
+            if oldest.active:
+                break
+            self._jobs.popitem(last=False)
+        task = asyncio.create_task(self._execute(job, run, on_finish))
+        self._tasks[job.id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job.id, None))
+        return job
+
+    async def _execute(self, job: Job, run: Callable[[], Awaitable[Any]], on_finish: Optional[Callable[[], None]]) -> None:
+        try:
+            job.result = await run()
+            job.status = "succeeded"
+        except asyncio.CancelledError:
+            job.status = "cancelled"
+            raise
+        except HTTPException as exc:
+            job.status = "failed"
+            job.error = {"status": exc.status_code, "detail": exc.detail}
+        except Exception as exc:
+            logger.exception("Job %s (%s) failed", job.id, job.kind)
+            job.status = "failed"
+            job.error = {"status": 500, "detail": str(exc)}
+        finally:
+            job.finished_at = time.time()
+            job._elapsed = time.monotonic() - job._started
+            if on_finish is not None:
+                on_finish()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    async def close(self) -> None:
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+_job_manager = JobManager()
+
+
+def get_job_manager() -> JobManager:
+    return _job_manager
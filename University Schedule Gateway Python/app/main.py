@@ -1,59 +1,123 @@
 from contextlib import asynccontextmanager
+from typing import Dict
 
 import httpx
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
+from .auth.dependencies import get_current_user
+from .auth.security import shutdown_password_hasher, token_cache_stats
+from .balancer import BalancedTransport, split_urls
+from .cache import ResponseCache, configure_response_cache, get_response_cache
 from .config import get_settings
 from .db.session import get_pool, init_schema, shutdown_pool
+from .jobs import get_job_manager
+from . import metrics
+from .resilience import CircuitBreaker, LatencyTracker, ResilientTransport, RetryBudget
 from .routes import auth as auth_routes
 from .routes import lab1 as lab1_routes
 from .routes import lab2 as lab2_routes
 from .routes import lab3 as lab3_routes
 from .routes import generator as generator_routes
+from .routes import dashboard as dashboard_routes
 
 settings = get_settings()
 
 
+_upstreams: Dict[str, ResilientTransport] = {}
+_balancers: Dict[str, BalancedTransport] = {}
+
+
+def _upstream_client(name: str, urls: str, health_path: str, timeout: float, max_connections: int) -> httpx.AsyncClient:
+    balancer = BalancedTransport(
+        name,
+        split_urls(urls),
+        httpx.AsyncHTTPTransport(
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        ),
+        health_path=health_path or None,
+        health_interval=settings.replica_health_interval_seconds,
+        eject_after=settings.replica_eject_after_failures,
+    )
+    transport = ResilientTransport(
+        name,
+        balancer,
+        breaker=CircuitBreaker(settings.circuit_breaker_failure_threshold, settings.circuit_breaker_reset_seconds),
+        budget=RetryBudget(settings.retry_budget_ratio, settings.retry_budget_min_per_second),
+        max_retries=settings.retry_max_attempts,
+        hedging=settings.hedging_enabled,
+        latency=LatencyTracker(min_samples=settings.hedging_min_samples),
+    )
+    _balancers[name] = balancer
+    _upstreams[name] = transport
+    return httpx.AsyncClient(
+        base_url=balancer.base_url,
+        timeout=httpx.Timeout(timeout, connect=settings.upstream_connect_timeout_seconds),
+        transport=transport,
+    )
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     pool = get_pool()
     pool.open()
     init_schema()
     
-    # HTTP клиент для Lab1
-    lab1_client = httpx.AsyncClient(base_url=settings.lab1_service_url, timeout=30.0)
+    # HTTP клиенты upstream-сервисов: свои таймауты, лимиты соединений и circuit breaker у каждого;
+    # несколько URL через запятую — балансировка между репликами
+    lab1_client = _upstream_client(
+        "lab1", settings.lab1_service_url, settings.lab1_health_path, settings.lab1_timeout_seconds, settings.lab1_max_connections
+    )
     lab1_routes.configure_http_client(lab1_client)
     
-    # HTTP клиент для Lab2
-    lab2_client = httpx.AsyncClient(base_url=settings.lab2_service_url, timeout=30.0)
+    lab2_client = _upstream_client(
+        "lab2", settings.lab2_service_url, settings.lab2_health_path, settings.lab2_timeout_seconds, settings.lab2_max_connections
+    )
     lab2_routes.configure_http_client(lab2_client)
     
-    # HTTP клиент для Lab3
-    lab3_client = httpx.AsyncClient(base_url=settings.lab3_service_url, timeout=30.0)
+    lab3_client = _upstream_client(
+        "lab3", settings.lab3_service_url, settings.lab3_health_path, settings.lab3_timeout_seconds, settings.lab3_max_connections
+    )
     lab3_routes.configure_http_client(lab3_client)
     
-    # HTTP клиент для Generator
-    generator_client = httpx.AsyncClient(base_url=settings.generator_service_url, timeout=300.0)
+    generator_client = _upstream_client(
+        "generator", settings.generator_service_url, settings.generator_health_path,
+        settings.generator_timeout_seconds, settings.generator_max_connections
+    )
     generator_routes.configure_http_client(generator_client)
     
+    for balancer in _balancers.values():
+        await balancer.start()
+    
+    # Кэш ответов Lab1/Lab2/Lab3
+    response_cache = ResponseCache(max_entries=settings.response_cache_max_entries) if settings.response_cache_enabled else None
+    configure_response_cache(response_cache)
+    
     try:
         yield
     finally:
+        await get_job_manager().close()
         await lab1_client.aclose()
         await lab2_client.aclose()
         await lab3_client.aclose()
         await generator_client.aclose()
+        if response_cache is not None:
+            await response_cache.close()
+        configure_response_cache(None)
+        shutdown_password_hasher()
         shutdown_pool()
 
 
 app = FastAPI(
     title="University Schedule Gateway Python API",
     version="1.0.0",
-    description="API gateway with JWT authentication. Provides proxy access to Lab1, Lab2, Lab3 and Generator services.",
+    description="API gateway with JWT authentication. Provides proxy access to Lab1, Lab2, Lab3 and Generator services and a combined dashboard.",
     lifespan=lifespan,
 )
 
+# Добавлен первым — оказывается внутри CORS и измеряет только обработку самого запроса
+app.add_middleware(metrics.MetricsMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.cors_origins,
@@ -67,6 +131,7 @@ app.include_router(lab1_routes.router)
 app.include_router(lab2_routes.router)
 app.include_router(lab3_routes.router)
 app.include_router(generator_routes.router)
+app.include_router(dashboard_routes.router)
 
 
 @app.get("/healthz", tags=["health"])
@@ -74,6 +139,59 @@ async def health_check() -> dict[str, str]:
     return {"status": "ok"}
 
 
+@app.get("/cache/stats", tags=["health"], dependencies=[Depends(get_current_user)])
+async def cache_stats() -> dict:
+    cache = get_response_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+
+@app.get("/upstreams/stats", tags=["health"], dependencies=[Depends(get_current_user)])
+async def upstream_stats() -> dict:
+    return {
+        name: {**transport.stats(), "replicas": _balancers[name].stats()}
+        for name, transport in _upstreams.items()
+    }
+
+
+def _collect_upstreams() -> None:
+    metrics.upstream_connections.replace({
+        (name, state): count
+        for name, balancer in _balancers.items()
+        for state, count in balancer.pool_stats().items()
+    })
+    metrics.upstream_outstanding.replace({
+        (name, replica["url"]): replica["outstanding"]
+        for name, balancer in _balancers.items()
+        for replica in balancer.stats()
+    })
+    metrics.upstream_circuit_open.replace({
+        (name,): 0 if transport.stats()["circuit"] == "closed" else 1
+        for name, transport in _upstreams.items()
+    })
+
+
+def _response_cache_snapshot() -> Dict[tuple, float]:
+    cache = get_response_cache()
+    if cache is None:
+        return {}
+    stats = cache.stats()
+    metrics.response_cache_entries.set((), stats["entries"])
+    return {(event,): stats[event] for event in ("hits", "stale_hits", "misses", "coalesced", "evictions", "purges")}
+
+
+metrics.registry.add_collector(_collect_upstreams)
+metrics.snapshot(metrics.db_pool, lambda: {(stat,): value for stat, value in get_pool().get_stats().items()})
+metrics.snapshot(metrics.jwt_cache_lookups, lambda: {(result,): value for result, value in token_cache_stats().items()})
+metrics.snapshot(metrics.response_cache_events, _response_cache_snapshot)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics() -> PlainTextResponse:
+    return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/", include_in_schema=False)
 async def root() -> dict[str, str]:
     return {"message": "University Schedule Gateway Python"}
@@ -0,0 +1,197 @@
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Границы корзин (секунды): от долей миллисекунды (кэш JWT) до минут (генератор)
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+Labels = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Labels, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, labels: Labels = (), amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def replace(self, values: Dict[Labels, float]) -> None:
+        self._values = dict(values)
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        for labels, value in self._values.items():
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {value:g}"
+
+
+class Gauge(Counter):
+    def set(self, labels: Labels, value: float) -> None:
+        self._values[labels] = value
+
+    def dec(self, labels: Labels = (), amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) - amount
+
+    def render(self) -> Iterable[str]:
+        for line in super().render():
+            yield line.replace(" counter", " gauge", 1) if line.startswith("# TYPE") else line
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._buckets = tuple(sorted(buckets))
+        # labels -> [счетчики корзин (без накопления)..., +Inf, sum]
+        self._series: Dict[Labels, List[float]] = {}
+
+    def observe(self, labels: Labels, value: float) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0.0] * (len(self._buckets) + 2)
+        series[bisect_left(self._buckets, value)] += 1
+        series[-1] += value
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        for labels, series in self._series.items():
+            cumulative = 0.0
+            for bound, count in zip(self._buckets, series):
+                cumulative += count
+                le = 'le="%g"' % bound
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative:g}"
+            cumulative += series[len(self._buckets)]
+            le = 'le="+Inf"'
+            yield f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative:g}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, labels)} {series[-1]:g}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative:g}"
+
+
+class Registry:
+    """Метрики процесса и сборщики, которые заполняют gauge непосредственно перед выдачей"""
+
+    def __init__(self) -> None:
+        self._metrics: List[Counter] = []
+        self._collectors: List[Callable[[], None]] = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        for collector in self._collectors:
+            collector()
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_request_seconds = registry.register(Histogram(
+    "gateway_http_request_duration_seconds", "Gateway request latency by route", ("method", "route", "status"),
+))
+http_requests_in_flight = registry.register(Gauge(
+    "gateway_http_requests_in_flight", "Requests currently being handled by the gateway",
+))
+upstream_request_seconds = registry.register(Histogram(
+    "gateway_upstream_request_duration_seconds", "Time to upstream response headers", ("upstream", "status"),
+))
+auth_seconds = registry.register(Histogram(
+    "gateway_auth_duration_seconds", "Time spent authenticating a request", ("outcome",),
+))
+jwt_cache_lookups = registry.register(Counter(
+    "gateway_jwt_cache_lookups_total", "Verified-JWT cache lookups", ("result",),
+))
+response_cache_events = registry.register(Counter(
+    "gateway_response_cache_events_total", "Response cache events", ("event",),
+))
+response_cache_entries = registry.register(Gauge(
+    "gateway_response_cache_entries", "Responses currently cached",
+))
+db_pool = registry.register(Gauge(
+    "gateway_db_pool", "psycopg_pool statistics of the users-table pool", ("stat",),
+))
+upstream_connections = registry.register(Gauge(
+    "gateway_upstream_connections", "httpx pool connections per upstream", ("upstream", "state"),
+))
+upstream_outstanding = registry.register(Gauge(
+    "gateway_upstream_outstanding_requests", "Requests in flight per upstream replica", ("upstream", "replica"),
+))
+upstream_circuit_open = registry.register(Gauge(
+    "gateway_upstream_circuit_open", "1 while the upstream circuit breaker is not closed", ("upstream",),
+))
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware: гистограмма длительности и счетчики статусов по шаблону маршрута
+    и gauge запросов в обработке. На запрос — два вызова perf_counter и одна запись в dict.
+    """
+
+    def __init__(self, app, exclude_paths: Sequence[str] = ("/metrics",)):
+        self.app = app
+        self._exclude = frozenset(exclude_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self._exclude:
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_requests_in_flight.dec()
+            route = scope.get("route")
+            # Шаблон пути, а не сам путь: иначе /api/v1/jobs/{id} порождал бы ряд на каждый id
+            template = getattr(route, "path", None) or "unmatched"
+            http_request_seconds.observe(
+                (scope["method"], template, str(status_code)),
+                time.perf_counter() - started,
+            )
+
+
+def snapshot(metric: Counter, read: Callable[[], Dict[Labels, float]]) -> None:
+    """Перед каждой выдачей заменять значения ``metric`` результатом ``read`` (счетчики, которые ведут сами компоненты)"""
+    def collect() -> None:
+        try:
+            values = read()
+        except Exception:
+            return
+        metric.replace(values)
+
+    registry.add_collector(collect)
+
+
+def observe_upstream(upstream: str, status: Optional[int], seconds: float) -> None:
+    upstream_request_seconds.observe((upstream, str(status) if status is not None else "error"), seconds)
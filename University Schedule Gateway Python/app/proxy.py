@@ -0,0 +1,129 @@
+import json
+from dataclasses import dataclass
+from typing import Any, Dict, Mapping, Optional
+
+import httpx
+from fastapi import HTTPException, Request, status
+from fastapi.responses import Response, StreamingResponse
+from starlette.background import BackgroundTask
+
+# Заголовки upstream-ответа, которые передаются клиенту как есть.
+# content-length и content-encoding корректны, потому что тело пересылается без распаковки.
+_FORWARDED_RESPONSE_HEADERS = (
+    "content-type",
+    "content-length",
+    "content-encoding",
+    "etag",
+    "last-modified",
+    "cache-control",
+    "server-timing",
+)
+
+
+# Заголовки, которые сохраняются вместе с телом в кэше. Тело хранится распакованным,
+# поэтому content-encoding и content-length не сохраняются (Response выставит длину сам).
+_CACHED_RESPONSE_HEADERS = (
+    "content-type",
+    "etag",
+    "last-modified",
+    "cache-control",
+    "server-timing",
+)
+
+
+@dataclass(frozen=True)
+class UpstreamPayload:
+    """Тело успешного ответа upstream в байтах и заголовки для клиента (то, что хранит кэш ответов)"""
+
+    body: bytes
+    status_code: int
+    headers: Dict[str, str]
+
+    def to_response(self) -> Response:
+        """Ответ клиенту теми же байтами, без разбора и повторной сериализации JSON"""
+        return Response(content=self.body, status_code=self.status_code, headers=self.headers)
+
+    def json(self) -> Any:
+        return json.loads(self.body)
+
+
+def _error_detail(response: httpx.Response) -> Any:
+    try:
+        return response.json()
+    except ValueError:
+        return response.text or "Unknown error"
+
+
+async def fetch_upstream(
+    client: httpx.AsyncClient,
+    path: str,
+    service_name: str,
+    params: Optional[Mapping[str, Any]] = None,
+) -> UpstreamPayload:
+    """GET к upstream: тело ответа в байтах; ошибки upstream — HTTPException с его ``detail``"""
+    try:
+        response = await client.get(path, params=params)
+    except httpx.RequestError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=f"{service_name} service unavailable: {exc}"
+        )
+    if response.status_code >= 400:
+        raise HTTPException(status_code=response.status_code, detail=_error_detail(response))
+    return UpstreamPayload(
+        body=response.content,
+        status_code=response.status_code,
+        headers={name: response.headers[name] for name in _CACHED_RESPONSE_HEADERS if name in response.headers},
+    )
+
+
+async def stream_upstream(
+    client: httpx.AsyncClient,
+    method: str,
+    path: str,
+    request: Request,
+    service_name: str,
+    params: Optional[Mapping[str, Any]] = None,
+    timeout: Optional[float] = None,
+) -> StreamingResponse:
+    """
+    Проксировать ответ upstream-сервиса потоком, без буферизации и повторной сериализации JSON.
+
+    Accept-Encoding клиента передается upstream, поэтому сжатое тело пересылается байт в байт.
+    Тело читается целиком только при ошибке (>= 400), чтобы вернуть его в ``detail``.
+    """
+    # Без заголовка httpx запросил бы gzip сам, а клиент мог его не поддерживать
+    headers = {"accept-encoding": request.headers.get("accept-encoding") or "identity"}
+    upstream_request = client.build_request(
+        method,
+        path,
+        params=params,
+        headers=headers,
+        timeout=timeout if timeout is not None else httpx.USE_CLIENT_DEFAULT,
+    )
+    try:
+        response = await client.send(upstream_request, stream=True)
+    except httpx.RequestError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=f"{service_name} service unavailable: {exc}"
+        )
+
+    if response.status_code >= 400:
+        try:
+            await response.aread()
+        finally:
+            await response.aclose()
+        raise HTTPException(status_code=response.status_code, detail=_error_detail(response))
+
+    forwarded = {
+        name: response.headers[name]
+        for name in _FORWARDED_RESPONSE_HEADERS
+        if name in response.headers
+    }
+    return StreamingResponse(
+        response.aiter_raw(),
+        status_code=response.status_code,
+        headers=forwarded,
+        background=BackgroundTask(response.aclose),
+    )
@@ -0,0 +1,296 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Set
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Ответы, после которых запрос к upstream имеет смысл повторить и которые считаются отказом
+_RETRYABLE_STATUS = {502, 503, 504}
+_IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+class CircuitOpenError(httpx.TransportError):
+    """Upstream временно отключен circuit breaker'ом"""
+
+
+class CircuitBreaker:
+    """
+    Классический breaker: closed -> open после ``failure_threshold`` отказов подряд,
+    через ``reset_timeout`` секунд — half-open с единственным пробным запросом.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 15.0):
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._failures = 0
+        self._state = "closed"
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    def allow(self) -> bool:
+        if self._state == "open":
+            if time.monotonic() - self._opened_at < self._reset_timeout:
+                return False
+            self._state = "half_open"
+            self._probe_in_flight = False
+        if self._state == "half_open":
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+        return True
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._state = "closed"
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._state == "half_open" or self._failures >= self._failure_threshold:
+            if self._state != "open":
+                logger.warning("Circuit opened after %d failures", self._failures)
+            self._state = "open"
+            self._opened_at = time.monotonic()
+        self._probe_in_flight = False
+
+    def record_abandoned(self) -> None:
+        """Запрос отменен клиентом — результат пробы неизвестен, разрешаем следующую"""
+        self._probe_in_flight = False
+
+
+class RetryBudget:
+    """
+    Бюджет повторов: каждый запрос добавляет ``ratio`` токена, каждый повтор или hedge тратит один.
+    ``min_per_second`` гарантирует немного повторов при малом трафике. Так повторы не могут
+    умножить нагрузку на и без того перегруженный upstream больше чем на ``1 + ratio``.
+    """
+
+    def __init__(self, ratio: float = 0.2, min_per_second: float = 1.0, max_tokens: float = 10.0):
+        self._ratio = ratio
+        self._min_per_second = min_per_second
+        self._max_tokens = max_tokens
+        self._tokens = max_tokens
+        self._updated = time.monotonic()
+
+    def _refill(self, amount: float) -> None:
+        now = time.monotonic()
+        self._tokens = min(self._max_tokens, self._tokens + amount + (now - self._updated) * self._min_per_second)
+        self._updated = now
+
+    def deposit(self) -> None:
+        self._refill(self._ratio)
+
+    def withdraw(self) -> bool:
+        self._refill(0.0)
+        if self._tokens < 1.0:
+            return False
+        self._tokens -= 1.0
+        return True
+
+
+class LatencyTracker:
+    """Скользящее окно длительностей успешных ответов для расчета перцентилей"""
+
+    def __init__(self, window: int = 256, min_samples: int = 50):
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._min_samples = min_samples
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        if len(self._samples) < self._min_samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(pct / 100.0 * len(ordered)))]
+
+
+class _OutcomeStream(httpx.AsyncByteStream):
+    """
+    Тело ответа, по которому breaker узнает итог запроса: успех — только когда тело
+    дочитано, сетевая ошибка посреди тела — отказ, закрытие недочитанного тела — неизвестно.
+    """
+
+    def __init__(self, stream: httpx.AsyncByteStream, breaker: CircuitBreaker):
+        self._stream = stream
+        self._breaker: Optional[CircuitBreaker] = breaker
+
+    def _settle(self, outcome: str) -> None:
+        if self._breaker is not None:
+            breaker, self._breaker = self._breaker, None
+            getattr(breaker, outcome)()
+
+    async def __aiter__(self):
+        try:
+            async for chunk in self._stream:
+                yield chunk
+        except httpx.TransportError:
+            self._settle("record_failure")
+            raise
+        self._settle("record_success")
+
+    async def aclose(self) -> None:
+        self._settle("record_abandoned")
+        await self._stream.aclose()
+
+
+class ResilientTransport(httpx.AsyncBaseTransport):
+    """
+    Транспорт httpx с защитой upstream: circuit breaker, повторы идемпотентных запросов
+    в рамках бюджета и, опционально, hedging — вторая копия GET-запроса, если первая
+    не ответила за наблюдаемый p95. Маршруты продолжают работать с обычным ``httpx.AsyncClient``.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        inner: httpx.AsyncBaseTransport,
+        breaker: CircuitBreaker,
+        budget: RetryBudget,
+        max_retries: int = 2,
+        retry_backoff: float = 0.05,
+        hedging: bool = False,
+        latency: Optional[LatencyTracker] = None,
+        hedge_min_delay: float = 0.01,
+    ):
+        self.name = name
+        self._inner = inner
+        self._breaker = breaker
+        self._budget = budget
+        self._max_retries = max_retries
+        self._retry_backoff = retry_backoff
+        self._hedging = hedging
+        self._latency = latency or LatencyTracker()
+        self._hedge_min_delay = hedge_min_delay
+        self._discarded: Set[asyncio.Task] = set()
+        self._stats = {"requests": 0, "retries": 0, "hedges": 0, "hedge_wins": 0, "rejected": 0}
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        idempotent = request.method in _IDEMPOTENT_METHODS
+        self._stats["requests"] += 1
+        self._budget.deposit()
+        if not self._breaker.allow():
+            self._stats["rejected"] += 1
+            raise CircuitOpenError(f"{self.name} circuit is open", request=request)
+
+        attempt = 0
+        while True:
+            try:
+                if self._hedging and idempotent:
+                    response = await self._send_hedged(request)
+                else:
+                    response = await self._send(request)
+            except asyncio.CancelledError:
+                self._breaker.record_abandoned()
+                raise
+            except httpx.TransportError:
+                self._breaker.record_failure()
+                if not self._may_retry(idempotent, attempt):
+                    raise
+            else:
+                if response.status_code not in _RETRYABLE_STATUS:
+                    # Итог фиксируется, когда тело дочитано или оборвалось, а не по заголовкам
+                    response.stream = _OutcomeStream(response.stream, self._breaker)
+                    return response
+                self._breaker.record_failure()
+                if not self._may_retry(idempotent, attempt):
+                    return response
+                await response.aclose()
+
+            attempt += 1
+            self._stats["retries"] += 1
+            await asyncio.sleep(self._retry_backoff * (2 ** (attempt - 1)))
+
+    def _may_retry(self, idempotent: bool, attempt: int) -> bool:
+        return (
+            idempotent
+            and attempt < self._max_retries
+            and self._breaker.allow()
+            and self._budget.withdraw()
+        )
+
+    async def _send(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        response = await self._inner.handle_async_request(request)
+        if response.status_code not in _RETRYABLE_STATUS:
+            self._latency.record(time.perf_counter() - started)
+        return response
+
+    async def _send_hedged(self, request: httpx.Request) -> httpx.Response:
+        p95 = self._latency.percentile(95)
+        if p95 is None:
+            return await self._send(request)
+
+        primary = asyncio.create_task(self._send(request))
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=max(p95, self._hedge_min_delay))
+        except asyncio.CancelledError:
+            # asyncio.wait не отменяет ожидаемую задачу — отменяем и дожидаемся ее в фоне
+            primary.cancel()
+            self._discard(primary)
+            raise
+        if done or not self._budget.withdraw():
+            return await primary
+
+        self._stats["hedges"] += 1
+        hedge = asyncio.create_task(self._send(request))
+        pending = {primary, hedge}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                winners = [task for task in done if task.exception() is None]
+                if winners:
+                    winner = primary if primary in winners else winners[0]
+                    if winner is hedge:
+                        self._stats["hedge_wins"] += 1
+                    for task in done:
+                        if task is not winner:
+                            self._discard(task)
+                    return winner.result()
+            # Обе копии завершились ошибкой — возвращаем ошибку основного запроса
+            raise primary.exception()
+        finally:
+            for task in pending:
+                task.cancel()
+                self._discard(task)
+
+    def _discard(self, task: asyncio.Task) -> None:
+        """Проигравшая копия: дождаться ее в фоне, закрыть ответ (вернуть соединение в пул) или прочитать ошибку"""
+        self._discarded.add(task)
+        task.add_done_callback(self._reap)
+
+    def _reap(self, task: asyncio.Task) -> None:
+        # Ошибку читаем всегда, иначе asyncio пишет "Task exception was never retrieved"
+        self._discarded.discard(task)
+        if task.cancelled():
+            return
+        exc = task.exception()
+        if exc is not None:
+            logger.debug("%s: discarded hedge copy failed: %s", self.name, exc)
+            return
+        result = task.result()
+        if isinstance(result, httpx.Response):
+            closer = asyncio.ensure_future(result.aclose())
+            self._discarded.add(closer)
+            closer.add_done_callback(self._reap)
+
+    def stats(self) -> Dict[str, Any]:
+        p95 = self._latency.percentile(95)
+        return {
+            **self._stats,
+            "circuit": self._breaker.state,
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+        }
+
+    async def aclose(self) -> None:
+        if self._discarded:
+            await asyncio.gather(*self._discarded, return_exceptions=True)
+        await self._inner.aclose()
@@ -1,27 +1,67 @@
-from fastapi import APIRouter, HTTPException, Response, status
+import logging
 
-from ..auth.security import create_access_token, hash_password, verify_password
+import psycopg
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from starlette.concurrency import run_in_threadpool
+
+from ..auth.security import (
+    PasswordHashingBusy,
+    create_access_token,
+    hash_password_async,
+    needs_rehash,
+    revoke_access_token,
+    verify_password_async,
+)
 from ..db.repository import UserRepository
 from ..models.auth import LoginRequest, RegisterRequest, TokenResponse
 
+logger = logging.getLogger(__name__)
 router = APIRouter(prefix="", tags=["auth"])
 _users = UserRepository()
+_bearer = HTTPBearer(auto_error=False)
+
+
+def _hashing_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Password hashing is overloaded, retry later",
+        headers={"Retry-After": "1"},
+    )
 
 
+# Обработчики async: bcrypt выполняется в выделенном пуле (hash_password_async/verify_password_async),
+# а sync-запросы к БД — в общем threadpool, поэтому event loop не блокируется
 @router.post("/register", status_code=status.HTTP_201_CREATED)
-def register(payload: RegisterRequest) -> dict[str, str]:
-    existing = _users.get_by_name(payload.name)
+async def register(payload: RegisterRequest) -> dict[str, str]:
+    existing = await run_in_threadpool(_users.get_by_name, payload.name)
     if existing:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="User already exists")
-    _users.create(payload.name, hash_password(payload.password))
+    try:
+        password_hash = await hash_password_async(payload.password)
+    except PasswordHashingBusy:
+        raise _hashing_busy()
+    await run_in_threadpool(_users.create, payload.name, password_hash)
     return {"status": "ok"}
 
 
 @router.post("/login", response_model=TokenResponse)
-def login(payload: LoginRequest, response: Response) -> TokenResponse:
-    user = _users.get_by_name(payload.name)
-    if not user or not verify_password(payload.password, user["password_hash"]):
+async def login(payload: LoginRequest, response: Response) -> TokenResponse:
+    user = await run_in_threadpool(_users.get_by_name, payload.name)
+    try:
+        valid = bool(user) and await verify_password_async(payload.password, user["password_hash"])
+    except PasswordHashingBusy:
+        raise _hashing_busy()
+    if not valid:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+    if needs_rehash(user["password_hash"]):
+        # Стоимость bcrypt изменилась — перехешируем, пока пароль известен. Необязательный шаг:
+        # пароль уже проверен, поэтому при перегрузке пула или ошибке БД токен все равно выдается
+        try:
+            new_hash = await hash_password_async(payload.password)
+            await run_in_threadpool(_users.update_password_hash, user["id"], new_hash)
+        except (PasswordHashingBusy, psycopg.Error) as exc:
+            logger.warning("Password rehash for user %s skipped: %s", user["id"], exc)
     token = create_access_token(str(user["id"]))
     response.set_cookie(
         key="access_token",
@@ -31,3 +71,11 @@ def login(payload: LoginRequest, response: Response) -> TokenResponse:
         samesite="lax",
     )
     return TokenResponse(access_token=token)
+
+
+@router.post("/logout")
+def logout(response: Response, credentials: HTTPAuthorizationCredentials = Depends(_bearer)) -> dict[str, str]:
+    if credentials is None or not revoke_access_token(credentials.credentials):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or expired token")
+    response.delete_cookie("access_token")
+    return {"status": "ok"}
@@ -0,0 +1,79 @@
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Dict, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from ..auth.dependencies import get_current_user
+from ..config import get_settings
+from ..proxy import UpstreamPayload
+from . import lab1 as lab1_routes
+from . import lab2 as lab2_routes
+from . import lab3 as lab3_routes
+
+router = APIRouter(tags=["dashboard"], dependencies=[Depends(get_current_user)])
+_settings = get_settings()
+
+
+async def _leg(report: Awaitable[UpstreamPayload], timeout: float) -> Dict[str, Any]:
+    """Выполнить одну часть сводки; ошибка или таймаут не роняют остальные части"""
+    lab3_routes.validate_period(lab3StartDate, lab3EndDate)
+    started = time.perf_counter()
+    result: Dict[str, Any] = {"data": None, "error": None}
+    try:
+        # Сводка собирает один документ, поэтому здесь (в отличие от маршрутов /labN) тело разбирается
+        result["data"] = (await asyncio.wait_for(report, timeout=timeout)).json()
+    except asyncio.TimeoutError:
+        result["error"] = {"status": 504, "detail": f"Timed out after {timeout:g}s"}
+    except HTTPException as exc:
+        result["error"] = {"status": exc.status_code, "detail": exc.detail}
+    except Exception as exc:
+        result["error"] = {"status": 502, "detail": f"Invalid upstream response: {exc}"}
+    result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return result
+
+
+@router.get("/dashboard", summary="Сводка Lab1, Lab2 и Lab3 одним запросом")
+async def dashboard(
+    searchTerm: str = Query("LAB1_UNIQUE_TOKEN_2025", description="Lab1: поисковый запрос по материалам"),
+    startDate: datetime = Query(datetime(2025, 9, 1, 0, 0, 0), description="Lab1: начало периода"),
+    endDate: datetime = Query(datetime(2025, 12, 31, 23, 59, 59), description="Lab1: конец периода"),
+    year: int = Query(2025, description="Lab2: год обучения"),
+    courseName: str = Query("Базы данных", description="Lab2: название курса"),
+    groupName: str = Query("ДО-02-23", description="Lab3: название группы"),
+    lab3StartDate: Optional[datetime] = Query(None, description="Lab3: начало периода (необязательно)"),
+    lab3EndDate: Optional[datetime] = Query(None, description="Lab3: конец периода (необязательно)"),
+):
+    """
+    Запрашивает отчеты Lab1, Lab2 и Lab3 параллельно и возвращает их одним документом.
+
+    Время ответа равно самой долгой части, а не их сумме; JWT проверяется один раз.
+    У каждой части свой таймаут. Если часть не удалась, остальные все равно
+    возвращаются, а для нее заполняется поле ``error``. Поле ``elapsed_ms`` содержит время
+    каждой части. Период Lab3 (``lab3StartDate``/``lab3EndDate``) задается отдельно от
+    периода Lab1; без него отчет Lab3 строится за все время.
+
+    **Требует JWT авторизацию.**
+    """
+    started = time.perf_counter()
+    lab1, lab2, lab3 = await asyncio.gather(
+        _leg(
+            lab1_routes.fetch_report(lab1_routes.build_params(searchTerm, startDate, endDate)),
+            _settings.dashboard_lab1_timeout_seconds,
+        ),
+        _leg(
+            lab2_routes.fetch_report(lab2_routes.build_params(year, courseName)),
+            _settings.dashboard_lab2_timeout_seconds,
+        ),
+        _leg(
+            lab3_routes.fetch_report(lab3_routes.build_params(groupName, lab3StartDate, lab3EndDate)),
+            _settings.dashboard_lab3_timeout_seconds,
+        ),
+    )
+    return {
+        "lab1": lab1,
+        "lab2": lab2,
+        "lab3": lab3,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
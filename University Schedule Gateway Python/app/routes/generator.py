@@ -1,13 +1,19 @@
 from typing import Optional, Dict, Any
 
 import httpx
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field
 
 from ..auth.dependencies import get_current_user
+from ..cache import get_response_cache
+from ..config import get_settings
+from ..jobs import JobConflict, get_job_manager
+from ..proxy import stream_upstream
 
 router = APIRouter(prefix="/api/v1", tags=["generator"], dependencies=[Depends(get_current_user)])
 _http_client: Optional[httpx.AsyncClient] = None
+_settings = get_settings()
 
 
 def configure_http_client(client: httpx.AsyncClient) -> None:
@@ -16,6 +22,13 @@ def configure_http_client(client: httpx.AsyncClient) -> None:
     _http_client = client
 
 
+def _purge_response_cache() -> None:
+    """Сбросить кэш отчетов Lab1/Lab2/Lab3 после изменения данных"""
+    cache = get_response_cache()
+    if cache is not None:
+        cache.purge()
+
+
 class GenerateRequest(BaseModel):
     """Запрос на генерацию данных"""
     specialties_count: int = Field(300, alias="SpecialtiesCount")
@@ -31,7 +44,7 @@ class GenerateRequest(BaseModel):
 
 
 @router.get("/pg_test", summary="Проверка PostgreSQL")
-async def proxy_postgres_test():
+async def proxy_postgres_test(request: Request):
     """
     Проверка подключения к PostgreSQL.
     Возвращает список студентов из БД.
@@ -44,6 +57,9 @@ async def proxy_postgres_test():
             detail="Gateway HTTP client is not ready"
         )
     
+    if _settings.streaming_proxy_enabled:
+        return await stream_upstream(_http_client, "GET", "/api/v1/pg_test", request, "Generator")
+    
     try:
         response = await _http_client.get("/api/v1/pg_test")
     except httpx.RequestError as exc:
@@ -66,7 +82,7 @@ async def proxy_postgres_test():
 
 
 @router.get("/redis_test", summary="Проверка Redis")
-async def proxy_redis_test():
+async def proxy_redis_test(request: Request):
     """
     Проверка подключения к Redis.
     Возвращает данные студента с ID=1.
@@ -79,6 +95,9 @@ async def proxy_redis_test():
             detail="Gateway HTTP client is not ready"
         )
     
+    if _settings.streaming_proxy_enabled:
+        return await stream_upstream(_http_client, "GET", "/api/v1/redis_test", request, "Generator")
+    
     try:
         response = await _http_client.get("/api/v1/redis_test")
     except httpx.RequestError as exc:
@@ -137,7 +156,7 @@ async def proxy_mongo_test():
 
 
 @router.get("/neo4j_test", summary="Проверка Neo4j")
-async def proxy_neo4j_test():
+async def proxy_neo4j_test(request: Request):
     """
     Проверка подключения к Neo4j.
     Возвращает первые 25 узлов из графовой БД.
@@ -150,6 +169,9 @@ async def proxy_neo4j_test():
             detail="Gateway HTTP client is not ready"
         )
     
+    if _settings.streaming_proxy_enabled:
+        return await stream_upstream(_http_client, "GET", "/api/v1/neo4j_test", request, "Generator")
+    
     try:
         response = await _http_client.get("/api/v1/neo4j_test")
     except httpx.RequestError as exc:
@@ -172,7 +194,7 @@ async def proxy_neo4j_test():
 
 
 @router.get("/elastic_test", summary="Проверка Elasticsearch")
-async def proxy_elastic_test():
+async def proxy_elastic_test(request: Request):
     """
     Проверка подключения к Elasticsearch.
     Возвращает все учебные материалы из индекса materials.
@@ -185,6 +207,9 @@ async def proxy_elastic_test():
             detail="Gateway HTTP client is not ready"
         )
     
+    if _settings.streaming_proxy_enabled:
+        return await stream_upstream(_http_client, "GET", "/api/v1/elastic_test", request, "Generator")
+    
     try:
         response = await _http_client.get("/api/v1/elastic_test")
     except httpx.RequestError as exc:
@@ -208,6 +233,7 @@ async def proxy_elastic_test():
 
 @router.get("/elastic_search", summary="Поиск в Elasticsearch")
 async def proxy_elastic_search(
+    request: Request,
     q: str = Query(..., description="Поисковый запрос")
 ):
     """
@@ -222,6 +248,11 @@ async def proxy_elastic_search(
             detail="Gateway HTTP client is not ready"
         )
     
+    if _settings.streaming_proxy_enabled:
+        return await stream_upstream(
+            _http_client, "GET", "/api/v1/elastic_search", request, "Generator", params={"q": q}
+        )
+    
     try:
         response = await _http_client.get(
             "/api/v1/elastic_search",
@@ -246,32 +277,11 @@ async def proxy_elastic_search(
     return response.json()
 
 
-@router.post("/generate", summary="Генерация тестовых данных")
-async def proxy_generate(request: GenerateRequest = None):
-    """
-    Генерирует и сохраняет тестовые данные во все базы данных:
-    - PostgreSQL (студенты, курсы, лекции, материалы)
-    - MongoDB (группы, университеты)
-    - Redis (кэш студентов)
-    - Neo4j (граф связей)
-    - Elasticsearch (индекс материалов)
-    
-    **Требует JWT авторизацию.**
-    """
-    if _http_client is None:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Gateway HTTP client is not ready"
-        )
-    
-    # Если запрос пустой, используем значения по умолчанию
-    if request is None:
-        request = GenerateRequest()
-    
+async def _generate(payload: Dict[str, Any]) -> Any:
     try:
         response = await _http_client.post(
             "/generate",
-            json=request.model_dump(by_alias=True),
+            json=payload,
             timeout=300.0  # 5 минут на генерацию
         )
     except httpx.RequestError as exc:
@@ -293,26 +303,7 @@ async def proxy_generate(request: GenerateRequest = None):
     return response.json()
 
 
-@router.delete("/cleanup", summary="Очистка всех баз данных")
-async def proxy_cleanup():
-    """
-    Удаляет все данные из всех баз данных:
-    - PostgreSQL
-    - MongoDB
-    - Redis
-    - Neo4j
-    - Elasticsearch
-    
-    ⚠️ **ВНИМАНИЕ: Это действие необратимо!**
-    
-    **Требует JWT авторизацию.**
-    """
-    if _http_client is None:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Gateway HTTP client is not ready"
-        )
-    
+async def _cleanup() -> Any:
     try:
         response = await _http_client.delete(
             "/cleanup",
@@ -335,3 +326,83 @@ async def proxy_cleanup():
         )
     
     return response.json()
+
+
+def _submit_job(kind: str, run) -> JSONResponse:
+    """Запустить задачу в фоне и сразу вернуть ее id; 409, если уже выполняется другая"""
+    if _http_client is None:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Gateway HTTP client is not ready"
+        )
+    
+    try:
+        # Даже при ошибке часть данных могла измениться — кэш сбрасывается по завершении в любом случае
+        job = get_job_manager().submit(kind, run, on_finish=_purge_response_cache)
+    except JobConflict as exc:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={"message": str(exc), "job_id": exc.active.id}
+        )
+    
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content={"job_id": job.id, "status": job.status, "status_url": f"/api/v1/jobs/{job.id}"},
+        headers={"Location": f"/api/v1/jobs/{job.id}"},
+    )
+
+
+@router.post("/generate", summary="Генерация тестовых данных", status_code=status.HTTP_202_ACCEPTED)
+async def proxy_generate(request: GenerateRequest = None):
+    """
+    Запускает генерацию тестовых данных во всех базах данных:
+    - PostgreSQL (студенты, курсы, лекции, материалы)
+    - MongoDB (группы, университеты)
+    - Redis (кэш студентов)
+    - Neo4j (граф связей)
+    - Elasticsearch (индекс материалов)
+    
+    Возвращает id задачи сразу; статус и результат — в `GET /api/v1/jobs/{id}`.
+    Одновременно выполняется только одна генерация или очистка (иначе 409).
+    
+    **Требует JWT авторизацию.**
+    """
+    # Если запрос пустой, используем значения по умолчанию
+    if request is None:
+        request = GenerateRequest()
+    
+    payload = request.model_dump(by_alias=True)
+    return _submit_job("generate", lambda: _generate(payload))
+
+
+@router.delete("/cleanup", summary="Очистка всех баз данных", status_code=status.HTTP_202_ACCEPTED)
+async def proxy_cleanup():
+    """
+    Запускает удаление всех данных из всех баз данных:
+    - PostgreSQL
+    - MongoDB
+    - Redis
+    - Neo4j
+    - Elasticsearch
+    
+    ⚠️ **ВНИМАНИЕ: Это действие необратимо!**
+    
+    Возвращает id задачи сразу; статус и результат — в `GET /api/v1/jobs/{id}`.
+    
+    **Требует JWT авторизацию.**
+    """
+    return _submit_job("cleanup", _cleanup)
+
+
+@router.get("/jobs/{job_id}", summary="Статус задачи генерации/очистки")
+async def get_job(job_id: str):
+    """
+    Статус задачи (`running`, `succeeded`, `failed`), время выполнения и итоговый результат
+    или ошибка upstream.
+    
+    **Требует JWT авторизацию.**
+    """
+    job = get_job_manager().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return job.to_dict()
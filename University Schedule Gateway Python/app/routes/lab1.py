@@ -1,13 +1,17 @@
 from datetime import datetime
-from typing import Optional
+from typing import Any, Dict, Optional
 
 import httpx
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 
 from ..auth.dependencies import get_current_user
+from ..cache import get_response_cache
+from ..config import get_settings
+from ..proxy import UpstreamPayload, fetch_upstream, stream_upstream
 
 router = APIRouter(tags=["lab1"], dependencies=[Depends(get_current_user)])
 _http_client: Optional[httpx.AsyncClient] = None
+_settings = get_settings()
 
 
 def configure_http_client(client: httpx.AsyncClient) -> None:
@@ -15,25 +19,46 @@ def configure_http_client(client: httpx.AsyncClient) -> None:
     _http_client = client
 
 
+def build_params(searchTerm: str, startDate: datetime, endDate: datetime) -> Dict[str, Any]:
+    return {
+        "searchTerm": searchTerm,
+        "startDate": startDate.isoformat(),
+        "endDate": endDate.isoformat(),
+    }
+
+
+async def _fetch(params: Dict[str, Any]) -> UpstreamPayload:
+    return await fetch_upstream(_http_client, "/lab1", "Lab1", params=params)
+
+
+async def fetch_report(params: Dict[str, Any]) -> UpstreamPayload:
+    """Raw Lab1 report bytes, served from the response cache when it is enabled."""
+    if _http_client is None:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Gateway HTTP client is not ready")
+    cache = get_response_cache()
+    ttl = _settings.lab1_cache_ttl_seconds
+    if cache is None or ttl <= 0:
+        return await _fetch(params)
+    return await cache.get_or_fetch(
+        "lab1", params, lambda: _fetch(params),
+        ttl=ttl,
+        stale_ttl=_settings.response_cache_stale_seconds,
+    )
+
+
 @router.get("/lab1")
 async def proxy_lab1(
+    request: Request,
     searchTerm: str = "LAB1_UNIQUE_TOKEN_2025",
     startDate: datetime = datetime(2025, 9, 1, 0, 0, 0),
     endDate: datetime = datetime(2025, 12, 31, 23, 59, 59)
     ):
     if _http_client is None:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Gateway HTTP client is not ready")
-    try:
-        response = await _http_client.get(
-            "/lab1",
-            params={
-                "searchTerm": searchTerm,
-                "startDate": startDate.isoformat(),
-                "endDate": endDate.isoformat(),
-            },
-        )
-    except httpx.RequestError as exc:
-        raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=f"Lab1 service unavailable: {exc}")
-    if response.status_code >= 400:
-        raise HTTPException(status_code=response.status_code, detail=response.json())
-    return response.json()
+    params = build_params(searchTerm, startDate, endDate)
+
+    if get_response_cache() is None or _settings.lab1_cache_ttl_seconds <= 0:
+        if _settings.streaming_proxy_enabled:
+            # Nothing to cache, so forward upstream bytes without parsing them
+            return await stream_upstream(_http_client, "GET", "/lab1", request, "Lab1", params=params)
+    return (await fetch_report(params)).to_response()
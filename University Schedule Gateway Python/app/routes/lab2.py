@@ -1,12 +1,16 @@
-from typing import Optional
+from typing import Any, Dict, Optional
 
 import httpx
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 
 from ..auth.dependencies import get_current_user
+from ..cache import get_response_cache
+from ..config import get_settings
+from ..proxy import UpstreamPayload, fetch_upstream, stream_upstream
 
 router = APIRouter(tags=["lab2"], dependencies=[Depends(get_current_user)])
 _http_client: Optional[httpx.AsyncClient] = None
+_settings = get_settings()
 
 
 def configure_http_client(client: httpx.AsyncClient) -> None:
@@ -15,8 +19,41 @@ def configure_http_client(client: httpx.AsyncClient) -> None:
     _http_client = client
 
 
+def build_params(year: int, courseName: str) -> Dict[str, Any]:
+    """Параметры запроса к Lab2"""
+    return {
+        "year": year,
+        # Forward using Lab2's expected snake_case param name
+        "course_name": courseName,
+    }
+
+
+async def _fetch(params: Dict[str, Any]) -> UpstreamPayload:
+    return await fetch_upstream(_http_client, "/lab2", "Lab2", params=params)
+
+
+async def fetch_report(params: Dict[str, Any]) -> UpstreamPayload:
+    """Отчет Lab2 (байты ответа upstream); при включенном кэше — через кэш ответов"""
+    if _http_client is None:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, 
+            detail="Gateway HTTP client is not ready"
+        )
+    # Отчеты зависят только от параметров; данные меняются лишь при генерации/очистке
+    cache = get_response_cache()
+    ttl = _settings.lab2_cache_ttl_seconds
+    if cache is None or ttl <= 0:
+        return await _fetch(params)
+    return await cache.get_or_fetch(
+        "lab2", params, lambda: _fetch(params),
+        ttl=ttl,
+        stale_ttl=_settings.response_cache_stale_seconds,
+    )
+
+
 @router.get("/lab2", summary="Отчет по курсу с количеством студентов")
 async def proxy_lab2(
+    request: Request,
     year: int = Query(2025, description="Год обучения"),
     courseName: str = Query("Базы данных", description="Название курса")
 ):
@@ -34,25 +71,10 @@ async def proxy_lab2(
             detail="Gateway HTTP client is not ready"
         )
     
-    try:
-        response = await _http_client.get(
-            "/lab2",
-            params={
-                "year": year,
-                # Forward using Lab2's expected snake_case param name
-                "course_name": courseName,
-            },
-        )
-    except httpx.RequestError as exc:
-        raise HTTPException(
-            status_code=status.HTTP_502_BAD_GATEWAY, 
-            detail=f"Lab2 service unavailable: {exc}"
-        )
-    
-    if response.status_code >= 400:
-        raise HTTPException(
-            status_code=response.status_code, 
-            detail=response.json()
-        )
+    params = build_params(year, courseName)
     
-    return response.json()
+    if get_response_cache() is None or _settings.lab2_cache_ttl_seconds <= 0:
+        if _settings.streaming_proxy_enabled:
+            # Без кэша тело не нужно разбирать — пересылаем байты upstream потоком
+            return await stream_upstream(_http_client, "GET", "/lab2", request, "Lab2", params=params)
+    return (await fetch_report(params)).to_response()
@@ -1,12 +1,17 @@
-from typing import Optional
+from datetime import datetime
+from typing import Any, Dict, Optional
 
 import httpx
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 
 from ..auth.dependencies import get_current_user
+from ..cache import get_response_cache
+from ..config import get_settings
+from ..proxy import UpstreamPayload, fetch_upstream, stream_upstream
 
 router = APIRouter(tags=["lab3"], dependencies=[Depends(get_current_user)])
 _http_client: Optional[httpx.AsyncClient] = None
+_settings = get_settings()
 
 
 def configure_http_client(client: httpx.AsyncClient) -> None:
@@ -15,9 +20,62 @@ def configure_http_client(client: httpx.AsyncClient) -> None:
     _http_client = client
 
 
+def build_params(
+    groupName: str,
+    startDate: Optional[datetime] = None,
+    endDate: Optional[datetime] = None,
+) -> Dict[str, Any]:
+    """Параметры запроса к Lab3; период передается, только если задан"""
+    params: Dict[str, Any] = {"groupName": groupName}
+    if startDate is not None and endDate is not None:
+        params["startDate"] = startDate.isoformat()
+        params["endDate"] = endDate.isoformat()
+    return params
+
+
+def validate_period(startDate: Optional[datetime], endDate: Optional[datetime]) -> None:
+    """Период Lab3 задается обеими границами, и начало не позже конца; иначе 422"""
+    if (startDate is None) != (endDate is None):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="startDate and endDate must be given together"
+        )
+    if startDate is not None and startDate > endDate:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="startDate must not be later than endDate"
+        )
+
+
+async def _fetch(params: Dict[str, Any]) -> UpstreamPayload:
+    return await fetch_upstream(_http_client, "/lab3", "Lab3", params=params)
+
+
+async def fetch_report(params: Dict[str, Any]) -> UpstreamPayload:
+    """Отчет Lab3 (байты ответа upstream); при включенном кэше — через кэш ответов"""
+    if _http_client is None:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, 
+            detail="Gateway HTTP client is not ready"
+        )
+    # Отчеты зависят только от параметров; данные меняются лишь при генерации/очистке
+    cache = get_response_cache()
+    ttl = _settings.lab3_cache_ttl_seconds
+    if cache is None or ttl <= 0:
+        return await _fetch(params)
+    return await cache.get_or_fetch(
+        "lab3", params, lambda: _fetch(params),
+        ttl=ttl,
+        stale_ttl=_settings.response_cache_stale_seconds,
+    )
+
+
 @router.get("/lab3", summary="Отчет по группе с информацией о посещаемости")
 async def proxy_lab3(
-    groupName: str = Query("ДО-02-23", description="Название группы")
+    request: Request,
+    groupName: str = Query("ДО-02-23", description="Название группы"),
+    startDate: Optional[datetime] = Query(None, description="Начало периода (необязательно)"),
+    endDate: Optional[datetime] = Query(None, description="Конец периода (необязательно)"),
 ):
     """
     Проксирует запрос к сервису Lab3 для получения отчета по группе.
@@ -35,23 +93,11 @@ async def proxy_lab3(
             detail="Gateway HTTP client is not ready"
         )
     
-    try:
-        response = await _http_client.get(
-            "/lab3",
-            params={
-                "groupName": groupName,
-            },
-        )
-    except httpx.RequestError as exc:
-        raise HTTPException(
-            status_code=status.HTTP_502_BAD_GATEWAY, 
-            detail=f"Lab3 service unavailable: {exc}"
-        )
-    
-    if response.status_code >= 400:
-        raise HTTPException(
-            status_code=response.status_code, 
-            detail=response.json()
-        )
+    validate_period(startDate, endDate)
+    params = build_params(groupName, startDate, endDate)
     
-    return response.json()
+    if get_response_cache() is None or _settings.lab3_cache_ttl_seconds <= 0:
+        if _settings.streaming_proxy_enabled:
+            # Без кэша тело не нужно разбирать — пересылаем байты upstream потоком
+            return await stream_upstream(_http_client, "GET", "/lab3", request, "Lab3", params=params)
+    return (await fetch_report(params)).to_response()
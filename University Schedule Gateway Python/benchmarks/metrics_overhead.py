@@ -0,0 +1,67 @@
+"""Microbenchmark of the cost of MetricsMiddleware per request.
+
+Drives a trivial ASGI app directly (no server, no sockets) with and without the
+middleware and prints the added time per request, plus the cost of rendering
+/metrics. Needs only the standard library:
+
+    python benchmarks/metrics_overhead.py --requests 200000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app import metrics  # noqa: E402
+
+
+class _Route:
+    path = "/lab1"
+
+
+async def _app(scope, receive, send):
+    scope["route"] = _Route
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+async def _receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def _send(message):
+    return None
+
+
+async def _drive(app, requests: int) -> float:
+    started = time.perf_counter()
+    for _ in range(requests):
+        scope = {"type": "http", "method": "GET", "path": "/lab1"}
+        await app(scope, _receive, _send)
+    return (time.perf_counter() - started) / requests * 1e6
+
+
+async def main(requests: int) -> None:
+    middleware = metrics.MetricsMiddleware(_app)
+    await _drive(_app, 1000)
+    await _drive(middleware, 1000)
+    bare = await _drive(_app, requests)
+    wrapped = await _drive(middleware, requests)
+
+    started = time.perf_counter()
+    body = metrics.registry.render()
+    render_ms = (time.perf_counter() - started) * 1000
+
+    print(f"requests:            {requests}")
+    print(f"bare ASGI app:       {bare:8.3f} us/request")
+    print(f"with middleware:     {wrapped:8.3f} us/request")
+    print(f"middleware overhead: {wrapped - bare:8.3f} us/request")
+    print(f"/metrics render:     {render_ms:8.3f} ms ({len(body)} bytes)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200_000)
+    asyncio.run(main(parser.parse_args().requests))
@@ -14,6 +14,13 @@ class Settings(BaseSettings):
     neo4j_password: str = Field(..., description="Neo4j password")
     report_limit: int = Field(10, description="Maximum number of students in report")
     elastic_search_limit: int = Field(3000, description="Maximum documents to fetch from Elasticsearch")
+    elastic_distinct_lecture_ids: bool = Field(True, description="Collect all distinct lecture ids via composite aggregation instead of a capped hit search")
+    elastic_composite_page_size: int = Field(1000, description="Buckets per composite aggregation page")
+    sql_attendance_aggregation: bool = Field(True, description="Aggregate attendance counts in PostgreSQL instead of Python")
+    graph_snapshot_enabled: bool = Field(False, description="Serve Neo4j adjacency lookups from an in-process snapshot")
+    graph_snapshot_refresh_seconds: float = Field(300.0, description="Interval between snapshot refresh checks (0 loads once)")
+    graph_snapshot_reload_on_version_change: bool = Field(True, description="Reload the snapshot only when relationship checksums change")
+    redis_fetch_chunk_size: int = Field(500, description="Students per pipelined Redis round trip")
 
     model_config = SettingsConfigDict(env_prefix="LAB1_", case_sensitive=False)
 
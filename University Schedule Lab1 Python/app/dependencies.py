@@ -1,31 +1,48 @@
-from elasticsearch import Elasticsearch
-from neo4j import GraphDatabase, Driver
-from psycopg_pool import ConnectionPool
-import redis
+from elasticsearch import AsyncElasticsearch
+from neo4j import AsyncGraphDatabase, AsyncDriver
+from psycopg_pool import AsyncConnectionPool
+import redis.asyncio as redis
 
 from .config import get_settings
+from .graph_snapshot import GraphSnapshotManager
 
 
 settings = get_settings()
-_pg_pool = ConnectionPool(settings.postgres_dsn, min_size=1, max_size=10, kwargs={"prepare_threshold": 0})
-_elastic_client = Elasticsearch(settings.elastic_url)
-_neo4j_driver: Driver = GraphDatabase.driver(
+_pg_pool = AsyncConnectionPool(
+    settings.postgres_dsn,
+    min_size=1,
+    max_size=10,
+    kwargs={"prepare_threshold": 0},
+    open=False,
+)
+_elastic_client = AsyncElasticsearch(settings.elastic_url)
+_neo4j_driver: AsyncDriver = AsyncGraphDatabase.driver(
     settings.neo4j_uri,
     auth=(settings.neo4j_user, settings.neo4j_password),
     max_connection_lifetime=3600,
 )
 _redis_client = redis.Redis.from_url(settings.redis_url, decode_responses=True)
+_graph_snapshot: GraphSnapshotManager | None = (
+    GraphSnapshotManager(
+        _neo4j_driver,
+        ("CAN_ATTEND", "HAS_LECTURE"),
+        refresh_interval=settings.graph_snapshot_refresh_seconds,
+        reload_on_version_change=settings.graph_snapshot_reload_on_version_change,
+    )
+    if settings.graph_snapshot_enabled
+    else None
+)
 
 
-def get_pg_pool() -> ConnectionPool:
+def get_pg_pool() -> AsyncConnectionPool:
     return _pg_pool
 
 
-def get_elastic() -> Elasticsearch:
+def get_elastic() -> AsyncElasticsearch:
     return _elastic_client
 
 
-def get_neo4j_driver() -> Driver:
+def get_neo4j_driver() -> AsyncDriver:
     return _neo4j_driver
 
 
@@ -33,18 +50,27 @@ def get_redis() -> redis.Redis:
     return _redis_client
 
 
+def get_graph_snapshot() -> GraphSnapshotManager | None:
+    return _graph_snapshot
+
+
 async def startup() -> None:
     # Open the pool eagerly so connection issues fail fast during startup.
-    _pg_pool.open()
+    await _pg_pool.open()
     try:
-        _elastic_client.ping()
+        await _elastic_client.ping()
     except Exception:
         # The application can still start; the real error will surface on first use.
         pass
+    if _graph_snapshot is not None:
+        # Loads in the background; lookups use Cypher until the snapshot is ready.
+        await _graph_snapshot.start()
 
 
 async def shutdown() -> None:
-    _pg_pool.close()
-    _neo4j_driver.close()
-    _redis_client.close()
-    _elastic_client.close()
+    if _graph_snapshot is not None:
+        await _graph_snapshot.stop()
+    await _pg_pool.close()
+    await _neo4j_driver.close()
+    await _redis_client.aclose()
+    await _elastic_client.close()
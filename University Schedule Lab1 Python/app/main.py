@@ -5,8 +5,9 @@ from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
 
 from .config import get_settings
-from .dependencies import get_elastic, get_neo4j_driver, get_pg_pool, get_redis, startup, shutdown
+from .dependencies import get_elastic, get_graph_snapshot, get_neo4j_driver, get_pg_pool, get_redis, startup, shutdown
 from .models.responses import LowAttendanceResponse
+from .repositories.attendance_repository import AttendanceRepository
 from .repositories.elastic_repository import ElasticMaterialsRepository
 from .repositories.neo4j_repository import LectureGraphRepository
 from .repositories.schedule_repository import ScheduleRepository
@@ -43,16 +44,18 @@ app.add_middleware(
 )
 
 elastic_repo = ElasticMaterialsRepository(get_elastic(), settings.elastic_index)
-lecture_repo = LectureGraphRepository(get_neo4j_driver())
+lecture_repo = LectureGraphRepository(get_neo4j_driver(), snapshot=get_graph_snapshot())
 schedule_repo = ScheduleRepository(get_pg_pool())
 visits_repo = VisitsRepository(get_pg_pool())
-student_repo = StudentRepository(get_redis())
+student_repo = StudentRepository(get_redis(), chunk_size=settings.redis_fetch_chunk_size)
+attendance_repo = AttendanceRepository(get_pg_pool()) if settings.sql_attendance_aggregation else None
 report_service = LowAttendanceReportService(
     elastic_repo,
     lecture_repo,
     schedule_repo,
     visits_repo,
     student_repo,
+    attendance_repo,
 )
 
 
@@ -89,7 +92,7 @@ async def get_low_attendance_report(
 ) -> LowAttendanceResponse:
     if end_date < start_date:
         raise HTTPException(status_code=400, detail="endDate must be greater than startDate")
-    results = report_service.get_report(search_term, start_date, end_date)
+    results = await report_service.get_report(search_term, start_date, end_date)
     return LowAttendanceResponse(results=results)
 
 
@@ -0,0 +1,84 @@
+from datetime import datetime
+from typing import Dict, Sequence, Tuple
+
+from psycopg_pool import AsyncConnectionPool
+
+from .visits_repository import VISIT_TIME_SLACK
+
+
+class AttendanceRepository:
+    def __init__(self, pool: AsyncConnectionPool) -> None:
+        self._pool = pool
+        self._query: str | None = None
+
+    async def _ensure_schema(self) -> None:
+        if self._query is not None:
+            return
+        async with self._pool.connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(
+                    "SELECT "
+                    "EXISTS (SELECT 1 FROM information_schema.tables WHERE table_schema = 'public' AND table_name = 'Schedules'), "
+                    "EXISTS (SELECT 1 FROM information_schema.tables WHERE table_schema = 'public' AND table_name = 'Visits')"
+                )
+                schedules_pascal, visits_pascal = await cur.fetchone()
+        if schedules_pascal:
+            schedule_table = '"Schedules"'
+            schedule = {"id": '"Id"', "lecture": '"LectureId"', "group": '"GroupId"', "start": '"StartTime"'}
+        else:
+            schedule_table = 'schedule'
+            schedule = {"id": 'id', "lecture": 'id_lect', "group": 'id_group', "start": '"startTime"'}
+        if visits_pascal:
+            visits_table = '"Visits"'
+            visits = {"student": '"StudentId"', "schedule": '"ScheduleId"', "time": '"VisitTime"'}
+        else:
+            visits_table = 'visits'
+            visits = {"student": 'student_id', "schedule": 'schedule_id', "time": '"visitTime"'}
+        # kind = 'g' rows carry per-group session totals, kind = 's' rows carry per-student attended counts.
+        # The visit-time bound lets Postgres prune visits partitions outside the report period.
+        self._query = (
+            "WITH sched AS ("
+            f"SELECT {schedule['id']} AS id, {schedule['group']} AS group_id "
+            f"FROM {schedule_table} "
+            f"WHERE {schedule['lecture']} = ANY(%s) "
+            f"AND {schedule['group']} = ANY(%s) "
+            f"AND {schedule['start']} BETWEEN %s AND %s"
+            ") "
+            "SELECT 'g' AS kind, group_id AS key_id, count(*) AS total FROM sched GROUP BY group_id "
+            "UNION ALL "
+            f"SELECT 's' AS kind, v.{visits['student']} AS key_id, count(DISTINCT v.{visits['schedule']}) AS total "
+            f"FROM {visits_table} v JOIN sched ON v.{visits['schedule']} = sched.id "
+            f"WHERE v.{visits['time']} BETWEEN %s AND %s "
+            f"GROUP BY v.{visits['student']}"
+        )
+
+    async def fetch_summary(
+        self,
+        lecture_ids: Sequence[int],
+        group_ids: Sequence[int],
+        start: datetime,
+        end: datetime,
+    ) -> Tuple[Dict[int, int], Dict[int, int]]:
+        if not lecture_ids or not group_ids:
+            return {}, {}
+        await self._ensure_schema()
+        assert self._query is not None
+        lectures_per_group: Dict[int, int] = {}
+        attended_by_student: Dict[int, int] = {}
+        async with self._pool.connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(
+                    self._query,
+                    (
+                        list(lecture_ids), list(group_ids), start, end,
+                        start - VISIT_TIME_SLACK, end + VISIT_TIME_SLACK,
+                    ),
+                )
+                async for kind, key_id, total in cur:
+                    if key_id is None:
+                        continue
+                    if kind == "g":
+                        lectures_per_group[int(key_id)] = int(total)
+                    else:
+                        attended_by_student[int(key_id)] = int(total)
+        return lectures_per_group, attended_by_student
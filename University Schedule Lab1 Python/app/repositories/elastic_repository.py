@@ -1,17 +1,17 @@
 from typing import List
 
-from elasticsearch import Elasticsearch
+from elasticsearch import AsyncElasticsearch
 
 
 class ElasticMaterialsRepository:
-    def __init__(self, client: Elasticsearch, index: str = "materials") -> None:
+    def __init__(self, client: AsyncElasticsearch, index: str = "materials") -> None:
         self._client = client
         self._index = index
 
-    def search_lecture_ids(self, phrase: str, limit: int) -> List[int]:
+    async def search_lecture_ids(self, phrase: str, limit: int) -> List[int]:
         if not phrase:
             return []
-        response = self._client.search(
+        response = await self._client.search(
             index=self._index,
             size=limit,
             query={
@@ -33,3 +33,41 @@ class ElasticMaterialsRepository:
                 continue
             lecture_ids.append(lecture_id)
         return lecture_ids
+
+    async def search_distinct_lecture_ids(self, phrase: str, page_size: int) -> List[int]:
+        if not phrase:
+            return []
+        # Composite terms aggregation pages through every distinct id_lect without returning hits.
+        lecture_ids: List[int] = []
+        after_key: dict | None = None
+        while True:
+            composite: dict = {
+                "size": page_size,
+                "sources": [{"id_lect": {"terms": {"field": "id_lect"}}}],
+            }
+            if after_key is not None:
+                composite["after"] = after_key
+            response = await self._client.search(
+                index=self._index,
+                size=0,
+                track_total_hits=False,
+                query={
+                    "match": {
+                        "lecture_text": {
+                            "query": phrase,
+                        }
+                    }
+                },
+                aggregations={"lectures": {"composite": composite}},
+            )
+            aggregation = response.get("aggregations", {}).get("lectures", {})
+            buckets = aggregation.get("buckets", [])
+            for bucket in buckets:
+                try:
+                    lecture_ids.append(int(bucket["key"]["id_lect"]))
+                except (KeyError, TypeError, ValueError):
+                    continue
+            after_key = aggregation.get("after_key")
+            if not buckets or after_key is None or len(buckets) < page_size:
+                break
+        return lecture_ids
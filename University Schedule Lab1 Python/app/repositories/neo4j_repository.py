@@ -1,25 +1,42 @@
 from typing import Iterable, List, Tuple
 
-from neo4j import Driver
+from neo4j import AsyncDriver
+
+from ..graph_snapshot import GraphSnapshotManager
 
 
 class LectureGraphRepository:
-    def __init__(self, driver: Driver, database: str = "neo4j") -> None:
+    def __init__(
+        self,
+        driver: AsyncDriver,
+        database: str = "neo4j",
+        snapshot: GraphSnapshotManager | None = None,
+    ) -> None:
         self._driver = driver
         self._database = database
+        self._snapshot = snapshot
 
-    def get_students_and_groups(self, lecture_ids: Iterable[int]) -> Tuple[List[int], List[int]]:
+    async def get_students_and_groups(self, lecture_ids: Iterable[int]) -> Tuple[List[int], List[int]]:
         ids = [int(i) for i in lecture_ids if i is not None]
         if not ids:
             return [], []
+        graph = self._snapshot.snapshot if self._snapshot is not None else None
+        if graph is not None:
+            student_ids: dict[int, None] = {}
+            group_ids: dict[int, None] = {}
+            for lecture_id in ids:
+                student_ids.update(dict.fromkeys(graph.incoming("CAN_ATTEND", lecture_id)))
+                group_ids.update(dict.fromkeys(graph.incoming("HAS_LECTURE", lecture_id)))
+            return list(student_ids), list(group_ids)
         query = (
             "MATCH (l:Lecture) WHERE l.id IN $LectureIds "
             "OPTIONAL MATCH (s:Student)-[:CAN_ATTEND]->(l) "
             "OPTIONAL MATCH (g:Group)-[:HAS_LECTURE]->(l) "
             "RETURN collect(DISTINCT s.id) AS StudentIds, collect(DISTINCT g.id) AS GroupIds"
         )
-        with self._driver.session(database=self._database) as session:
-            record = session.run(query, LectureIds=ids).single()
+        async with self._driver.session(database=self._database) as session:
+            result = await session.run(query, LectureIds=ids)
+            record = await result.single()
         student_ids = [int(i) for i in record["StudentIds"] or [] if i is not None]
         group_ids = [int(i) for i in record["GroupIds"] or [] if i is not None]
         return student_ids, group_ids
@@ -2,22 +2,22 @@ from datetime import datetime
 from typing import List, Sequence
 
 from psycopg.rows import dict_row
-from psycopg_pool import ConnectionPool
+from psycopg_pool import AsyncConnectionPool
 
 
 class ScheduleRepository:
-    def __init__(self, pool: ConnectionPool) -> None:
+    def __init__(self, pool: AsyncConnectionPool) -> None:
         self._pool = pool
         self._table_name: str | None = None
         self._columns: dict[str, str] | None = None
 
-    def _ensure_schema(self) -> None:
+    async def _ensure_schema(self) -> None:
         if self._table_name is not None:
             return
-        with self._pool.connection() as conn:
-            with conn.cursor() as cur:
-                cur.execute("SELECT EXISTS (SELECT 1 FROM information_schema.tables WHERE table_schema = 'public' AND table_name = 'Schedules')")
-                exists_pascal = cur.fetchone()[0]
+        async with self._pool.connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute("SELECT EXISTS (SELECT 1 FROM information_schema.tables WHERE table_schema = 'public' AND table_name = 'Schedules')")
+                exists_pascal = (await cur.fetchone())[0]
         if exists_pascal:
             self._table_name = '"Schedules"'
             self._columns = {
@@ -37,10 +37,10 @@ class ScheduleRepository:
                 "end": '"endTime"',
             }
 
-    def fetch(self, lecture_ids: Sequence[int], group_ids: Sequence[int], start: datetime, end: datetime) -> List[dict]:
+    async def fetch(self, lecture_ids: Sequence[int], group_ids: Sequence[int], start: datetime, end: datetime) -> List[dict]:
         if not lecture_ids or not group_ids:
             return []
-        self._ensure_schema()
+        await self._ensure_schema()
         assert self._columns is not None and self._table_name is not None
         query = (
             f"SELECT {self._columns['id']} AS id, {self._columns['lecture']} AS lecture_id, "
@@ -54,8 +54,8 @@ class ScheduleRepository:
             "AND "
             f"{self._columns['start']} BETWEEN %s AND %s"
         )
-        with self._pool.connection() as conn:
-            with conn.cursor(row_factory=dict_row) as cur:
-                cur.execute(query, (list(lecture_ids), list(group_ids), start, end))
-                rows = cur.fetchall()
+        async with self._pool.connection() as conn:
+            async with conn.cursor(row_factory=dict_row) as cur:
+                await cur.execute(query, (list(lecture_ids), list(group_ids), start, end))
+                rows = await cur.fetchall()
         return rows
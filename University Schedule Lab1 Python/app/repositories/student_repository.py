@@ -1,20 +1,38 @@
+import asyncio
 from datetime import datetime
-from typing import Dict, Iterable, List, Optional
+from typing import Dict, Iterable, List, Optional, Sequence
 
-import redis
+import redis.asyncio as redis
 
 
 class StudentRepository:
-    def __init__(self, client: redis.Redis, key_prefix: str = "student:") -> None:
+    def __init__(self, client: redis.Redis, key_prefix: str = "student:", chunk_size: int = 500) -> None:
         self._client = client
         self._key_prefix = key_prefix
+        self._chunk_size = max(1, chunk_size)
 
-    def fetch_many(self, ids: Iterable[int]) -> List[dict]:
+    async def fetch_many(self, ids: Iterable[int]) -> List[dict]:
         distinct_ids = sorted({int(i) for i in ids if i is not None})
+        if not distinct_ids:
+            return []
+        chunks = [
+            distinct_ids[offset:offset + self._chunk_size]
+            for offset in range(0, len(distinct_ids), self._chunk_size)
+        ]
+        # One pipelined round trip per chunk; chunks are sent concurrently.
+        results = await asyncio.gather(*(self._fetch_chunk(chunk) for chunk in chunks))
         students: List[dict] = []
-        for student_id in distinct_ids:
-            key = f"{self._key_prefix}{student_id}"
-            data = self._client.hgetall(key)
+        for chunk_students in results:
+            students.extend(chunk_students)
+        return students
+
+    async def _fetch_chunk(self, student_ids: Sequence[int]) -> List[dict]:
+        async with self._client.pipeline(transaction=False) as pipe:
+            for student_id in student_ids:
+                pipe.hgetall(f"{self._key_prefix}{student_id}")
+            replies = await pipe.execute()
+        students: List[dict] = []
+        for student_id, data in zip(student_ids, replies):
             if not data:
                 continue
             student = self._deserialize(student_id, data)
@@ -1,34 +1,40 @@
-﻿from typing import Iterable, List
+﻿from datetime import datetime, timedelta
+from typing import Iterable, List, Optional
 
 from psycopg.rows import dict_row
-from psycopg_pool import ConnectionPool
+from psycopg_pool import AsyncConnectionPool
+
+# Visits are recorded around the scheduled session, which may start just before ``end``
+# and run past it, so the visit-time window is widened by this much on both sides.
+VISIT_TIME_SLACK = timedelta(days=1)
 
 
 class VisitsRepository:
-    def __init__(self, pool: ConnectionPool) -> None:
+    def __init__(self, pool: AsyncConnectionPool) -> None:
         self._pool = pool
         self._table_name: str | None = None
         self._columns: dict[str, str] | None = None
 
-    def _ensure_schema(self) -> None:
+    async def _ensure_schema(self) -> None:
         if self._table_name is not None:
             return
-        with self._pool.connection() as conn:
-            with conn.cursor() as cur:
-                cur.execute("""
+        async with self._pool.connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute("""
                     SELECT EXISTS (
                         SELECT 1 FROM information_schema.tables 
                         WHERE table_schema = 'public' 
                         AND table_name = 'Visits'
                     )
                 """)
-                exists_pascal = cur.fetchone()[0]
+                exists_pascal = (await cur.fetchone())[0]
         if exists_pascal:
             self._table_name = '"Visits"'
             self._columns = {
                 "id": '"Id"',
                 "student": '"StudentId"',
                 "schedule": '"ScheduleId"',
+                "time": '"VisitTime"',
             }
         else:
             self._table_name = 'visits'
@@ -36,13 +42,23 @@ class VisitsRepository:
                 "id": 'id',
                 "student": 'student_id',
                 "schedule": 'schedule_id',
+                "time": '"visitTime"',
             }
 
-    def fetch_by_schedule(self, schedule_ids: Iterable[int]) -> List[dict]:
+    async def fetch_by_schedule(
+        self,
+        schedule_ids: Iterable[int],
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> List[dict]:
+        """
+        Visits of the given sessions. With ``start``/``end`` (the report period) the visit
+        time is bounded too, so Postgres prunes visits partitions outside the period.
+        """
         ids = [int(i) for i in schedule_ids if i is not None]
         if not ids:
             return []
-        self._ensure_schema()
+        await self._ensure_schema()
         assert self._table_name is not None and self._columns is not None
         placeholders = "%s"
         query = (
@@ -52,8 +68,12 @@ class VisitsRepository:
             "WHERE "
             f"{self._columns['schedule']} = ANY(%s)"
         )
-        with self._pool.connection() as conn:
-            with conn.cursor(row_factory=dict_row) as cur:
-                cur.execute(query, (ids,))
-                rows = cur.fetchall()
+        params: list = [ids]
+        if start is not None and end is not None:
+            query += f" AND {self._columns['time']} BETWEEN %s AND %s"
+            params += [start - VISIT_TIME_SLACK, end + VISIT_TIME_SLACK]
+        async with self._pool.connection() as conn:
+            async with conn.cursor(row_factory=dict_row) as cur:
+                await cur.execute(query, params)
+                rows = await cur.fetchall()
         return rows
@@ -1,8 +1,10 @@
+import asyncio
 from collections import defaultdict
 from datetime import datetime
-from typing import List
+from typing import Dict, List, Optional, Sequence, Tuple
 
 from ..config import get_settings
+from ..repositories.attendance_repository import AttendanceRepository
 from ..repositories.elastic_repository import ElasticMaterialsRepository
 from ..repositories.neo4j_repository import LectureGraphRepository
 from ..repositories.schedule_repository import ScheduleRepository
@@ -18,46 +20,44 @@ class LowAttendanceReportService:
         schedule_repo: ScheduleRepository,
         visits_repo: VisitsRepository,
         student_repo: StudentRepository,
+        attendance_repo: Optional[AttendanceRepository] = None,
     ) -> None:
         self._elastic_repo = elastic_repo
         self._lecture_repo = lecture_repo
         self._schedule_repo = schedule_repo
         self._visits_repo = visits_repo
         self._student_repo = student_repo
+        self._attendance_repo = attendance_repo
         self._settings = get_settings()
 
-    def get_report(self, search_term: str, start: datetime, end: datetime) -> List[dict]:
+    async def get_report(self, search_term: str, start: datetime, end: datetime) -> List[dict]:
         limit = self._settings.report_limit
-        lecture_ids = self._elastic_repo.search_lecture_ids(search_term, self._settings.elastic_search_limit)
+        if self._settings.elastic_distinct_lecture_ids:
+            lecture_ids = await self._elastic_repo.search_distinct_lecture_ids(
+                search_term, self._settings.elastic_composite_page_size
+            )
+        else:
+            lecture_ids = await self._elastic_repo.search_lecture_ids(search_term, self._settings.elastic_search_limit)
         if not lecture_ids:
             return []
-        student_ids, group_ids = self._lecture_repo.get_students_and_groups(lecture_ids)
+        student_ids, group_ids = await self._lecture_repo.get_students_and_groups(lecture_ids)
         if not student_ids or not group_ids:
             return []
 
-        schedules = self._schedule_repo.fetch(lecture_ids, group_ids, start, end)
-        if not schedules:
-            return []
-        schedule_ids = [row["id"] for row in schedules]
-        visits = self._visits_repo.fetch_by_schedule(schedule_ids)
-        students = self._student_repo.fetch_many(student_ids)
-        if not students:
+        # Schedule/visits and Redis students are independent once the graph step is done.
+        (lectures_per_group, attended_by_student), students = await asyncio.gather(
+            self._fetch_attendance(lecture_ids, group_ids, start, end),
+            self._student_repo.fetch_many(student_ids),
+        )
+        if not lectures_per_group or not students:
             return []
         students_by_id = {student["id"]: student for student in students}
 
-        lectures_per_group = defaultdict(int)
-        for schedule in schedules:
-            lectures_per_group[schedule["group_id"]] += 1
-
-        visits_by_student = defaultdict(set)
-        for visit in visits:
-            visits_by_student[visit["student_id"]].add(visit["schedule_id"])
-
         report_items: List[dict] = []
         for student_id, student in students_by_id.items():
             group_id = student.get("group_id")
             total = lectures_per_group.get(group_id, 0)
-            attended = len(visits_by_student.get(student_id, set()))
+            attended = attended_by_student.get(student_id, 0)
             percentage = round((attended / total) * 100.0, 2) if total else 0.0
             report_items.append(
                 {
@@ -73,3 +73,29 @@ class LowAttendanceReportService:
 
         report_items.sort(key=lambda item: item["attendance_percentage"])
         return report_items[:limit]
+
+    async def _fetch_attendance(
+        self,
+        lecture_ids: Sequence[int],
+        group_ids: Sequence[int],
+        start: datetime,
+        end: datetime,
+    ) -> Tuple[Dict[int, int], Dict[int, int]]:
+        if self._attendance_repo is not None:
+            return await self._attendance_repo.fetch_summary(lecture_ids, group_ids, start, end)
+
+        schedules = await self._schedule_repo.fetch(lecture_ids, group_ids, start, end)
+        if not schedules:
+            return {}, {}
+        schedule_ids = [row["id"] for row in schedules]
+        visits = await self._visits_repo.fetch_by_schedule(schedule_ids, start, end)
+
+        lectures_per_group = defaultdict(int)
+        for schedule in schedules:
+            lectures_per_group[schedule["group_id"]] += 1
+
+        visits_by_student = defaultdict(set)
+        for visit in visits:
+            visits_by_student[visit["student_id"]].add(visit["schedule_id"])
+        attended_by_student = {student_id: len(visited) for student_id, visited in visits_by_student.items()}
+        return lectures_per_group, attended_by_student
@@ -0,0 +1,82 @@
+"""Load benchmark for the /lab1 report endpoint.
+
+Runs N concurrent clients against a running Lab1 instance and prints p50/p99
+latency and throughput. Run it once against the previous build and once against
+the current one to compare:
+
+    pip install httpx
+    python benchmarks/report_latency.py --url http://localhost:8100 --clients 50 --requests 1000
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import List
+
+import httpx
+
+
+DEFAULT_PARAMS = {
+    "searchTerm": "LAB1_UNIQUE_TOKEN_2025",
+    "startDate": "2025-09-01T00:00:00Z",
+    "endDate": "2025-12-31T23:59:59Z",
+}
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100.0 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def _client(client: httpx.AsyncClient, params: dict, queue: asyncio.Queue, latencies: List[float], errors: List[int]) -> None:
+    while True:
+        try:
+            queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        started = time.perf_counter()
+        try:
+            response = await client.get("/lab1", params=params)
+            if response.status_code >= 400:
+                errors.append(response.status_code)
+        except httpx.HTTPError:
+            errors.append(0)
+        latencies.append((time.perf_counter() - started) * 1000.0)
+
+
+async def run(url: str, clients: int, requests: int, params: dict) -> None:
+    queue: asyncio.Queue = asyncio.Queue()
+    for _ in range(requests):
+        queue.put_nowait(None)
+    latencies: List[float] = []
+    errors: List[int] = []
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(base_url=url, timeout=120.0, limits=limits) as client:
+        # Warm-up request so schema detection and connection setup are not measured.
+        await client.get("/lab1", params=params)
+        started = time.perf_counter()
+        await asyncio.gather(*(_client(client, params, queue, latencies, errors) for _ in range(clients)))
+        elapsed = time.perf_counter() - started
+
+    print(f"clients={clients} requests={len(latencies)} errors={len(errors)}")
+    print(f"p50={_percentile(latencies, 50):.1f}ms p99={_percentile(latencies, 99):.1f}ms "
+          f"mean={statistics.fmean(latencies):.1f}ms")
+    print(f"throughput={len(latencies) / elapsed:.1f} req/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:8100")
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--search-term", default=DEFAULT_PARAMS["searchTerm"])
+    parser.add_argument("--start-date", default=DEFAULT_PARAMS["startDate"])
+    parser.add_argument("--end-date", default=DEFAULT_PARAMS["endDate"])
+    args = parser.parse_args()
+    params = {"searchTerm": args.search_term, "startDate": args.start_date, "endDate": args.end_date}
+    asyncio.run(run(args.url, args.clients, args.requests, params))
+
+
+if __name__ == "__main__":
+    main()
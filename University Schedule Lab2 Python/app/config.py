@@ -9,6 +9,9 @@ class Settings(BaseSettings):
     neo4j_uri: str = Field(..., description="Neo4j bolt URI")
     neo4j_user: str = Field(..., description="Neo4j username")
     neo4j_password: str = Field(..., description="Neo4j password")
+    graph_snapshot_enabled: bool = Field(False, description="Serve Neo4j adjacency lookups from an in-process snapshot")
+    graph_snapshot_refresh_seconds: float = Field(300.0, description="Interval between snapshot refresh checks (0 loads once)")
+    graph_snapshot_reload_on_version_change: bool = Field(True, description="Reload the snapshot only when relationship checksums change")
 
     model_config = SettingsConfigDict(env_prefix="LAB2_", case_sensitive=False)
 
@@ -1,7 +1,10 @@
+from typing import Optional
+
 from neo4j import GraphDatabase, AsyncGraphDatabase, AsyncDriver
 from psycopg_pool import ConnectionPool
 
 from .config import get_settings
+from .graph_snapshot import GraphSnapshotManager
 
 
 settings = get_settings()
@@ -21,6 +24,16 @@ _neo4j_driver: AsyncDriver = AsyncGraphDatabase.driver(
     max_connection_lifetime=3600,
 )
 
+# Снимок графа (HAS_LECTURE, BELONGS_TO) в памяти процесса, если включен
+_graph_snapshot: Optional[GraphSnapshotManager] = None
+if settings.graph_snapshot_enabled:
+    _graph_snapshot = GraphSnapshotManager(
+        _neo4j_driver,
+        ("HAS_LECTURE", "BELONGS_TO"),
+        refresh_interval=settings.graph_snapshot_refresh_seconds,
+        reload_on_version_change=settings.graph_snapshot_reload_on_version_change,
+    )
+
 
 def get_pg_pool() -> ConnectionPool:
     """Получить пул подключений PostgreSQL"""
@@ -32,12 +45,22 @@ def get_neo4j_driver() -> AsyncDriver:
     return _neo4j_driver
 
 
+def get_graph_snapshot() -> Optional[GraphSnapshotManager]:
+    """Получить менеджер снимка графа Neo4j (None, если отключен)"""
+    return _graph_snapshot
+
+
 async def startup() -> None:
     """Инициализация при запуске приложения"""
     _pg_pool.open()
+    if _graph_snapshot is not None:
+        # Снимок грузится в фоне, до готовности запросы идут в Neo4j
+        await _graph_snapshot.start()
 
 
 async def shutdown() -> None:
     """Очистка ресурсов при остановке приложения"""
+    if _graph_snapshot is not None:
+        await _graph_snapshot.stop()
     _pg_pool.close()
     await _neo4j_driver.close()
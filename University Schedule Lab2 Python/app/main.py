@@ -1,4 +1,5 @@
 from contextlib import asynccontextmanager
+from functools import lru_cache
 from fastapi import FastAPI, Depends, Query
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -34,13 +35,18 @@ app.add_middleware(
 )
 
 
+@lru_cache()
 def get_report_service() -> ReportService:
-    """Dependency для получения сервиса отчетов"""
+    """
+    Dependency для получения сервиса отчетов.
+    Репозитории создаются один раз на процесс, чтобы определение схемы
+    таблиц (PascalCase/snake_case) выполнялось только при первом запросе.
+    """
     pg_pool = dependencies.get_pg_pool()
     neo4j_driver = dependencies.get_neo4j_driver()
     
     course_repo = CourseRepository(pg_pool)
-    lecture_repo = LectureRepository(pg_pool, neo4j_driver)
+    lecture_repo = LectureRepository(pg_pool, neo4j_driver, dependencies.get_graph_snapshot())
     
     return ReportService(course_repo, lecture_repo)
 
@@ -1,17 +1,24 @@
-from typing import Optional, List
+from typing import Dict, Optional, List
 from psycopg_pool import ConnectionPool
 from psycopg.rows import dict_row
 from neo4j import AsyncDriver
 
+from app.graph_snapshot import GraphSnapshotManager
 from app.models.lab2_models import Lecture, GroupStudentCountDto
 
 
 class LectureRepository:
     """Репозиторий для работы с лекциями (PostgreSQL + Neo4j)"""
     
-    def __init__(self, pg_pool: ConnectionPool, neo4j_driver: AsyncDriver) -> None:
+    def __init__(
+        self,
+        pg_pool: ConnectionPool,
+        neo4j_driver: AsyncDriver,
+        graph_snapshot: Optional[GraphSnapshotManager] = None,
+    ) -> None:
         self._pg_pool = pg_pool
         self._neo4j = neo4j_driver
+        self._graph_snapshot = graph_snapshot
         self._table_name: Optional[str] = None
         self._columns: Optional[dict[str, str]] = None
     
@@ -88,6 +95,16 @@ class LectureRepository:
         :param lecture_id: ID лекции
         :return: Список GroupStudentCountDto
         """
+        graph = self._graph_snapshot.snapshot if self._graph_snapshot is not None else None
+        if graph is not None:
+            return [
+                GroupStudentCountDto(
+                    group_id=group_id,
+                    student_count=graph.incoming_degree("BELONGS_TO", group_id)
+                )
+                for group_id in sorted(set(graph.incoming("HAS_LECTURE", lecture_id)))
+            ]
+        
         cypher_query = """
             MATCH (l:Lecture {id: $LectureId})
             MATCH (g:Group)-[:HAS_LECTURE]->(l)
@@ -118,3 +135,50 @@ class LectureRepository:
                 print(f"Error getting groups from Neo4j for lecture {lecture_id}: {e}")
         
         return results
+    
+    async def get_student_counts_for_lectures(
+        self, lecture_ids: List[int]
+    ) -> Dict[int, int]:
+        """
+        Получает суммарное количество студентов групп для каждой лекции
+        одним запросом к Neo4j (UNWIND по списку ID)
+        
+        :param lecture_ids: Список ID лекций
+        :return: Словарь lecture_id -> количество студентов
+        """
+        if not lecture_ids:
+            return {}
+        
+        graph = self._graph_snapshot.snapshot if self._graph_snapshot is not None else None
+        if graph is not None:
+            return {
+                lecture_id: sum(
+                    graph.incoming_degree("BELONGS_TO", group_id)
+                    for group_id in set(graph.incoming("HAS_LECTURE", lecture_id))
+                )
+                for lecture_id in lecture_ids
+            }
+        
+        cypher_query = """
+            UNWIND $LectureIds AS lectureId
+            MATCH (l:Lecture {id: lectureId})
+            MATCH (g:Group)-[:HAS_LECTURE]->(l)
+            WITH lectureId, g
+            OPTIONAL MATCH (s:Student)-[:BELONGS_TO]->(g)
+            RETURN lectureId AS LectureId, count(s) AS StudentCount
+        """
+        
+        counts: Dict[int, int] = {}
+        
+        async with self._neo4j.session(database="neo4j") as session:
+            try:
+                cursor = await session.run(cypher_query, {"LectureIds": list(lecture_ids)})
+                records = await cursor.values()
+                
+                for record in records:
+                    if record and len(record) >= 2 and record[0] is not None:
+                        counts[int(record[0])] = int(record[1]) if record[1] is not None else 0
+            except Exception as e:
+                print(f"Error getting student counts from Neo4j for lectures {lecture_ids}: {e}")
+        
+        return counts
@@ -41,17 +41,10 @@ class ReportService:
         # Получаем все лекции курса в указанном году из PostgreSQL
         lectures = self._lecture_repo.get_lectures_by_course_id(course.id, year)
         
-        # Для каждой лекции получаем группы и количество студентов из Neo4j
-        lecture_dict: Dict[int, int] = {}
-        
-        for lecture in lectures:
-            groups = await self._lecture_repo.get_groups_with_student_count_for_lecture(
-                lecture.id
-            )
-            
-            # Суммируем студентов по всем группам
-            total_students = sum(group.student_count for group in groups)
-            lecture_dict[lecture.id] = total_students
+        # Количество студентов по всем лекциям — одним запросом к Neo4j
+        lecture_dict: Dict[int, int] = await self._lecture_repo.get_student_counts_for_lectures(
+            [lecture.id for lecture in lectures]
+        )
         
         # Формируем DTO для ответа
         lectures_dto = [
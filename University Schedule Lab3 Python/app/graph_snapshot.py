@@ -0,0 +1,176 @@
+import asyncio
+import logging
+from array import array
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from neo4j import AsyncDriver
+
+
+logger = logging.getLogger(__name__)
+
+# (метка источника, метка цели) для каждого типа связи, который может храниться в снимке
+RELATIONSHIP_LABELS: Dict[str, Tuple[str, str]] = {
+    "CAN_ATTEND": ("Student", "Lecture"),
+    "HAS_LECTURE": ("Group", "Lecture"),
+    "BELONGS_TO": ("Student", "Group"),
+}
+
+
+class CsrAdjacency:
+    """Список смежности в формате CSR: id узла -> срез массива int64 с соседями"""
+
+    __slots__ = ("_rows", "_offsets", "_targets")
+
+    def __init__(self, edges: Iterable[Tuple[int, int]]) -> None:
+        self._rows: Dict[int, int] = {}
+        self._offsets = array("q")
+        self._targets = array("q")
+        for source, target in sorted(edges):
+            if source not in self._rows:
+                self._rows[source] = len(self._offsets)
+                self._offsets.append(len(self._targets))
+            self._targets.append(target)
+        self._offsets.append(len(self._targets))
+
+    def neighbors(self, node_id: int) -> Sequence[int]:
+        row = self._rows.get(node_id)
+        if row is None:
+            return ()
+        return self._targets[self._offsets[row]:self._offsets[row + 1]]
+
+    def degree(self, node_id: int) -> int:
+        row = self._rows.get(node_id)
+        if row is None:
+            return 0
+        return self._offsets[row + 1] - self._offsets[row]
+
+    def __len__(self) -> int:
+        return len(self._targets)
+
+
+class GraphSnapshot:
+    """Неизменяемая копия выбранных типов связей в памяти процесса, проиндексированная в обе стороны"""
+
+    def __init__(self, edges: Dict[str, List[Tuple[int, int]]], version: Tuple[int, ...]) -> None:
+        self.version = version
+        self._outgoing = {rel: CsrAdjacency(pairs) for rel, pairs in edges.items()}
+        self._incoming = {rel: CsrAdjacency((target, source) for source, target in pairs) for rel, pairs in edges.items()}
+
+    def outgoing(self, relationship: str, node_id: int) -> Sequence[int]:
+        return self._outgoing[relationship].neighbors(node_id)
+
+    def incoming(self, relationship: str, node_id: int) -> Sequence[int]:
+        return self._incoming[relationship].neighbors(node_id)
+
+    def incoming_degree(self, relationship: str, node_id: int) -> int:
+        return self._incoming[relationship].degree(node_id)
+
+
+class GraphSnapshotManager:
+    """
+    Фоновая загрузка и обновление GraphSnapshot.
+
+    Пока первая загрузка не завершена, ``snapshot`` равен ``None`` и репозитории используют Cypher.
+    Каждые ``refresh_interval`` секунд граф перезагружается; при ``reload_on_version_change``
+    сначала сравниваются контрольные суммы id связей каждого типа, и неизменённые данные не перечитываются.
+    """
+
+    def __init__(
+        self,
+        driver: AsyncDriver,
+        relationships: Sequence[str],
+        refresh_interval: float = 300.0,
+        reload_on_version_change: bool = True,
+        database: str = "neo4j",
+    ) -> None:
+        unknown = [rel for rel in relationships if rel not in RELATIONSHIP_LABELS]
+        if unknown:
+            raise ValueError(f"Неподдерживаемые типы связей: {unknown}")
+        self._driver = driver
+        self._relationships = tuple(relationships)
+        self._refresh_interval = refresh_interval
+        self._reload_on_version_change = reload_on_version_change
+        self._database = database
+        self._snapshot: Optional[GraphSnapshot] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def snapshot(self) -> Optional[GraphSnapshot]:
+        return self._snapshot
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def refresh(self, force: bool = False) -> bool:
+        version = await self._fetch_version()
+        current = self._snapshot
+        if not force and current is not None and self._reload_on_version_change and current.version == version:
+            return False
+        edges = {rel: await self._fetch_edges(rel) for rel in self._relationships}
+        self._snapshot = GraphSnapshot(edges, version)
+        logger.info(
+            "Graph snapshot loaded: %s",
+            ", ".join(f"{rel}={len(pairs)}" for rel, pairs in edges.items()),
+        )
+        return True
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.refresh(force=self._snapshot is None)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Graph snapshot refresh failed")
+            if self._refresh_interval <= 0 and self._snapshot is not None:
+                return
+            await asyncio.sleep(self._refresh_interval if self._refresh_interval > 0 else 30.0)
+
+    async def _fetch_version(self) -> Tuple[int, ...]:
+        # Контрольная сумма по парам (id источника, id цели), а не только число связей: после
+        # повторной генерации с теми же параметрами число связей то же (BELONGS_TO всегда равно
+        # числу студентов), а id и связи другие. Каждая пара перемешивается нелинейно (квадрат / куб
+        # по модулю простого) до суммирования: линейная сумма зависит только от множеств id источников
+        # и целей и не замечает перестановку студентов по группам. Значения меньше 2^62 — без переполнения.
+        # Считается в Neo4j, по сети — три числа на тип.
+        version: List[int] = []
+        async with self._driver.session(database=self._database) as session:
+            for rel in self._relationships:
+                source_label, target_label = RELATIONSHIP_LABELS[rel]
+                result = await session.run(
+                    f"MATCH (a:{source_label})-[:{rel}]->(b:{target_label}) "
+                    "WHERE a.id IS NOT NULL AND b.id IS NOT NULL "
+                    "WITH (a.id * 1000003 + b.id) % 2147483647 AS x, "
+                    "(b.id * 999983 + a.id * 31) % 2147483629 AS y "
+                    "RETURN count(*) AS total, "
+                    "sum((x * x) % 2147483647) AS h1, "
+                    "sum((((y * y) % 2147483629) * y) % 2147483629) AS h2"
+                )
+                record = await result.single()
+                version.extend(int(record[key] or 0) if record else 0 for key in ("total", "h1", "h2"))
+        return tuple(version)
+
+    async def _fetch_edges(self, relationship: str) -> List[Tuple[int, int]]:
+        source_label, target_label = RELATIONSHIP_LABELS[relationship]
+        query = (
+            f"MATCH (a:{source_label})-[:{relationship}]->(b:{target_label}) "
+            "WHERE a.id IS NOT NULL AND b.id IS NOT NULL "
+            "RETURN a.id AS source, b.id AS target"
+        )
+        edges: List[Tuple[int, int]] = []
+        async with self._driver.session(database=self._database) as session:
+            result = await session.run(query)
+            async for record in result:
+                edges.append((int(record["source"]), int(record["target"])))
+        return edges
@@ -1,7 +1,9 @@
 import logging
 import os
 import uuid
-from fastapi import FastAPI, Query, Request
+from datetime import datetime
+from typing import Optional
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from contextlib import asynccontextmanager
 from .database import DatabaseConnections
 from .repositories.group_repository import GroupRepository
@@ -16,6 +18,7 @@ from .models.lab3_models import GroupReportResponse
 
 # Глобальное подключение к БД
 LOG_LEVEL = os.getenv("LAB3_LOG_LEVEL", "INFO").upper()
+SQL_ATTENDANCE_AGGREGATION = os.getenv("LAB3_SQL_ATTENDANCE_AGGREGATION", "true").lower() in ("1", "true", "yes")
 logging.basicConfig(
     level=LOG_LEVEL,
     format="%(asctime)s %(levelname)s %(name)s %(message)s",
@@ -64,9 +67,25 @@ async def root():
     }
 
 
+@app.get("/pool-stats", tags=["Health"])
+async def pool_stats():
+    """Статистика пула PostgreSQL: размер, очередь и время ожидания соединения"""
+    return db_connections.get_pool_stats()
+
+
+@app.post("/schema/reload", tags=["Health"])
+async def reload_schema():
+    """Перечитать схему таблиц PostgreSQL (после миграции)"""
+    schemas = await db_connections.schema_catalog.reload()
+    return {"status": "reloaded", "schemas": schemas}
+
+
 @app.get("/lab3", response_model=GroupReportResponse, tags=["Lab3"])
 async def get_group_report(
-    groupName: str = Query("ДО-02-23", description="Название группы")
+    response: Response,
+    groupName: str = Query("ДО-02-23", description="Название группы"),
+    startDate: Optional[datetime] = Query(None, description="Начало периода (необязательно)"),
+    endDate: Optional[datetime] = Query(None, description="Конец периода (необязательно)")
 ) -> GroupReportResponse:
     """
     Получить отчет по группе:
@@ -74,19 +93,29 @@ async def get_group_report(
     - Список студентов с общими и посещенными часами
     
     Пример: /lab3?groupName=ДЕФ-02-24
+
+    С ``startDate`` и ``endDate`` учитываются только занятия и посещения за период.
+    Период задается обеими границами; одна граница или startDate > endDate — ошибка 422.
     """
+    if (startDate is None) != (endDate is None):
+        raise HTTPException(status_code=422, detail="startDate and endDate must be given together")
+    if startDate is not None and startDate > endDate:
+        raise HTTPException(status_code=422, detail="startDate must not be later than endDate")
+
     # Инициализация репозиториев
     mongo_db = db_connections.get_mongo_db()
     
-    group_repo = GroupRepository(mongo_db, db_connections.postgres_conn)
+    group_repo = GroupRepository(mongo_db, db_connections.postgres_pool)
     student_repo = StudentRepository(db_connections.redis_client)
-    course_repo = CourseRepository(db_connections.postgres_conn)
+    course_repo = CourseRepository(db_connections.postgres_pool, db_connections.schema_catalog)
     lecture_repo = LectureRepository(
-        db_connections.postgres_conn,
-        db_connections.neo4j_driver
+        db_connections.postgres_pool,
+        db_connections.neo4j_driver,
+        db_connections.schema_catalog,
+        db_connections.graph_snapshot
     )
-    schedule_repo = ScheduleRepository(db_connections.postgres_conn)
-    visits_repo = VisitsRepository(db_connections.postgres_conn)
+    schedule_repo = ScheduleRepository(db_connections.postgres_pool, db_connections.schema_catalog)
+    visits_repo = VisitsRepository(db_connections.postgres_pool, db_connections.schema_catalog)
     
     # Инициализация сервиса
     service = GroupReportService(
@@ -95,8 +124,13 @@ async def get_group_report(
         course_repo=course_repo,
         lecture_repo=lecture_repo,
         schedule_repo=schedule_repo,
-        visits_repo=visits_repo
+        visits_repo=visits_repo,
+        aggregate_attendance=SQL_ATTENDANCE_AGGREGATION
     )
     
-    # Получение отчета
-    return await service.get_group_report(groupName)
+    # Получение отчета; длительности этапов отдаем в заголовке Server-Timing
+    report = await service.get_group_report(groupName, startDate, endDate)
+    response.headers["Server-Timing"] = ", ".join(
+        f"{stage};dur={duration}" for stage, duration in service.stage_timings.items()
+    )
+    return report
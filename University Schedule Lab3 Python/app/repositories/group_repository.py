@@ -36,17 +36,17 @@ class GroupRepository:
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from typing import Optional
 from ..models.lab3_models import Group
-from psycopg import AsyncConnection
+from psycopg_pool import AsyncConnectionPool
 
 
 class GroupRepository:
     """Доступ к данным группы: первично MongoDB (коллекция groups),
     при отсутствии документа — fallback в Postgres (таблица Groups)."""
 
-    def __init__(self, db: AsyncIOMotorDatabase, pg_conn: Optional[AsyncConnection] = None):
+    def __init__(self, db: AsyncIOMotorDatabase, pg_pool: Optional[AsyncConnectionPool] = None):
         self.db = db
         self.collection = db.groups
-        self.pg_conn = pg_conn
+        self.pg_pool = pg_pool
 
     async def get_by_name(self, name: str) -> Optional[Group]:
         """Получить группу по её названию."""
@@ -68,42 +68,47 @@ class GroupRepository:
                 )
 
             # 3) Fallback: Postgres
-            if self.pg_conn:
+            # Каждая попытка на своем соединении из пула: ошибка первого запроса
+            # (нет таблицы) откатывает только его транзакцию
+            if self.pg_pool:
                 # Try PascalCase schema first
-                async with self.pg_conn.cursor() as cursor:
-                    try:
-                        await cursor.execute(
-                            'SELECT "Id", "Name", "DepartmentId", EXTRACT(YEAR FROM "StartYear")::int AS "Year" '
-                            'FROM "Groups" WHERE "Name" = %s',
-                            (name,)
-                        )
-                        row = await cursor.fetchone()
-                        if row:
-                            return Group(
-                                Id=int(row[0]),
-                                Name=row[1],
-                                DepartmentId=int(row[2]),
-                                Year=int(row[3])
+                try:
+                    async with self.pg_pool.connection() as conn:
+                        async with conn.cursor() as cursor:
+                            await cursor.execute(
+                                'SELECT "Id", "Name", "DepartmentId", EXTRACT(YEAR FROM "StartYear")::int AS "Year" '
+                                'FROM "Groups" WHERE "Name" = %s',
+                                (name,)
                             )
-                    except Exception:
-                        pass
-                    # Fallback to snake_case schema
-                    try:
-                        await cursor.execute(
-                            'SELECT id, name, department_id, EXTRACT(YEAR FROM start_year)::int AS year '
-                            'FROM groups WHERE name = %s',
-                            (name,)
+                            row = await cursor.fetchone()
+                    if row:
+                        return Group(
+                            Id=int(row[0]),
+                            Name=row[1],
+                            DepartmentId=int(row[2]),
+                            Year=int(row[3])
                         )
-                        row = await cursor.fetchone()
-                        if row:
-                            return Group(
-                                Id=int(row[0]),
-                                Name=row[1],
-                                DepartmentId=int(row[2]),
-                                Year=int(row[3])
+                except Exception:
+                    pass
+                # Fallback to snake_case schema
+                try:
+                    async with self.pg_pool.connection() as conn:
+                        async with conn.cursor() as cursor:
+                            await cursor.execute(
+                                'SELECT id, name, department_id, EXTRACT(YEAR FROM start_year)::int AS year '
+                                'FROM groups WHERE name = %s',
+                                (name,)
                             )
-                    except Exception:
-                        pass
+                            row = await cursor.fetchone()
+                    if row:
+                        return Group(
+                            Id=int(row[0]),
+                            Name=row[1],
+                            DepartmentId=int(row[2]),
+                            Year=int(row[3])
+                        )
+                except Exception:
+                    pass
             return None
         except Exception as e:
             print(f"Error in get_by_name: {e}")
@@ -1,93 +1,78 @@
-from psycopg import AsyncConnection
+from psycopg_pool import AsyncConnectionPool
 from neo4j import AsyncDriver
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 import logging
+from ..graph_snapshot import GraphSnapshotManager
+from ..schema_catalog import SchemaCatalog
 from ..models.lab3_models import Lecture
 
 
 class LectureRepository:
     """Репозиторий для работы с лекциями в PostgreSQL и Neo4j"""
     
-    def __init__(self, pg_conn: AsyncConnection, neo4j_driver: AsyncDriver):
-        self.pg_conn = pg_conn
+    def __init__(
+        self,
+        pg_pool: AsyncConnectionPool,
+        neo4j_driver: AsyncDriver,
+        catalog: SchemaCatalog,
+        graph_snapshot: Optional[GraphSnapshotManager] = None
+    ):
+        self.pg_pool = pg_pool
+        self.catalog = catalog
         self.neo4j_driver = neo4j_driver
+        self.graph_snapshot = graph_snapshot
         self._log = logging.getLogger(__name__)
     
-    async def _detect_schema(self) -> str:
-        """Определить схему таблицы (PascalCase или snake_case)"""
-        async with self.pg_conn.cursor() as cursor:
-            await cursor.execute("""
-                SELECT column_name FROM information_schema.columns
-                WHERE table_name = 'Lectures' AND column_name = 'Id'
-            """)
-            result = await cursor.fetchone()
-            return "pascal" if result else "snake"
-    
     async def get_by_course_ids(self, course_ids: List[int]) -> List[Lecture]:
         """Получить лекции по ID курсов"""
         if not course_ids:
             return []
         
-        schema = await self._detect_schema()
-        self._log.debug("lectures by course ids: n=%d schema=%s", len(course_ids), schema)
+        self._log.debug("lectures by course ids: n=%d", len(course_ids))
+        query = await self.catalog.query("lectures_by_course_ids")
+        async with self.pg_pool.connection() as conn:
+            async with conn.cursor() as cursor:
+                await cursor.execute(query, (course_ids,))
+                rows = await cursor.fetchall()
         
-        if schema == "pascal":
-            query = """
-                SELECT "Id", "Name", "Requirements", "Year", "CourseId"
-                FROM "Lectures"
-                WHERE "CourseId" = ANY(%s)
-            """
-        else:
-            query = """
-                SELECT id, name, requirements, year, course_id
-                FROM lectures
-                WHERE course_id = ANY(%s)
-            """
+        lectures = []
+        for row in rows:
+            lectures.append(Lecture(
+                Id=row[0],
+                Name=row[1],
+                Requirements=row[2],
+                Year=row[3],
+                CourseId=row[4]
+            ))
         
-        async with self.pg_conn.cursor() as cursor:
-            await cursor.execute(query, (course_ids,))
-            rows = await cursor.fetchall()
-            
-            lectures = []
-            for row in rows:
-                lectures.append(Lecture(
-                    Id=row[0],
-                    Name=row[1],
-                    Requirements=row[2],
-                    Year=row[3],
-                    CourseId=row[4]
-                ))
-            
-            return lectures
+        return lectures
     
     async def get_group_details(self, group_id: int) -> Tuple[List[int], List[int]]:
         """
         Получить детали группы из Neo4j: списки ID студентов и лекций
         Возвращает: (student_ids, lecture_ids)
         """
+        graph = self.graph_snapshot.snapshot if self.graph_snapshot else None
+        if graph is not None:
+            student_ids = list(graph.incoming("BELONGS_TO", group_id))
+            lecture_ids = list(graph.outgoing("HAS_LECTURE", group_id))
+            self._log.debug("Snapshot group_details: students=%d lectures=%d", len(student_ids), len(lecture_ids))
+            return student_ids, lecture_ids
+        
         async with self.neo4j_driver.session() as session:
-            # Получаем студентов группы
-            student_result = await session.run(
-                """
-                MATCH (s:Student)-[:BELONGS_TO]->(g:Group {id: $groupId})
-                RETURN s.id as studentId
-                """,
-                groupId=group_id
-            )
-            student_records = await student_result.data()
-            student_ids = [record["studentId"] for record in student_records]
-            
-            # Получаем лекции, которые может посещать группа
-            lecture_result = await session.run(
+            # Студенты и лекции группы одним запросом (один round trip вместо двух)
+            result = await session.run(
                 """
-                MATCH (g:Group {id: $groupId})-[:HAS_LECTURE]->(l:Lecture)
-                RETURN l.id as lectureId
+                MATCH (g:Group {id: $groupId})
+                RETURN [(s:Student)-[:BELONGS_TO]->(g) | s.id] AS studentIds,
+                       [(g)-[:HAS_LECTURE]->(l:Lecture) | l.id] AS lectureIds
                 """,
                 groupId=group_id
             )
-            lecture_records = await lecture_result.data()
-            lecture_ids = [record["lectureId"] for record in lecture_records]
-            self._log.debug("Neo4j group_details: students=%d lectures=%d", len(student_ids), len(lecture_ids))
-            return student_ids, lecture_ids
+            records = await result.data()
+        student_ids = [sid for record in records for sid in record["studentIds"]]
+        lecture_ids = [lid for record in records for lid in record["lectureIds"]]
+        self._log.debug("Neo4j group_details: students=%d lectures=%d", len(student_ids), len(lecture_ids))
+        return student_ids, lecture_ids
 
 
@@ -1,63 +1,49 @@
-from psycopg import AsyncConnection
-from typing import List
+from psycopg_pool import AsyncConnectionPool
+from datetime import datetime
+from typing import List, Optional, Tuple
 import logging
 from ..models.lab3_models import Schedule
+from ..schema_catalog import SchemaCatalog
 
 
 class ScheduleRepository:
     """Репозиторий для работы с расписанием в PostgreSQL"""
     
-    def __init__(self, conn: AsyncConnection):
-        self.conn = conn
+    def __init__(self, pool: AsyncConnectionPool, catalog: SchemaCatalog):
+        self.pool = pool
+        self.catalog = catalog
         self._log = logging.getLogger(__name__)
     
-    async def _detect_schema(self) -> str:
-        """Определить схему таблицы (PascalCase или snake_case)"""
-        async with self.conn.cursor() as cursor:
-            await cursor.execute("""
-                SELECT column_name FROM information_schema.columns
-                WHERE table_name = 'Schedules' AND column_name = 'Id'
-            """)
-            result = await cursor.fetchone()
-            return "pascal" if result else "snake"
-    
     async def get_by_lecture_and_group(
         self, 
         lecture_ids: List[int], 
-        group_id: int
+        group_id: int,
+        period: Optional[Tuple[datetime, datetime]] = None
     ) -> List[Schedule]:
-        """Получить расписание по ID лекций и группы"""
+        """Получить расписание по ID лекций и группы (с началом занятия в ``period``, если задан)"""
         if not lecture_ids:
             return []
         
-        schema = await self._detect_schema()
-        self._log.debug("schedule schema=%s lecture_ids=%d group_id=%s", schema, len(lecture_ids), group_id)
-        
-        if schema == "pascal":
-            query = """
-                SELECT "Id", "LectureId", "GroupId", "StartTime", "EndTime"
-                FROM "Schedules"
-                WHERE "LectureId" = ANY(%s) AND "GroupId" = %s
-            """
+        self._log.debug("schedule lecture_ids=%d group_id=%s", len(lecture_ids), group_id)
+        if period is None:
+            query = await self.catalog.query("schedules_by_lecture_and_group")
+            params = (lecture_ids, group_id)
         else:
-            query = """
-                SELECT id, lecture_id, group_id, start_time, end_time
-                FROM schedules
-                WHERE lecture_id = ANY(%s) AND group_id = %s
-            """
+            query = await self.catalog.query("schedules_by_lecture_and_group_in_period")
+            params = (lecture_ids, group_id, *period)
+        async with self.pool.connection() as conn:
+            async with conn.cursor() as cursor:
+                await cursor.execute(query, params)
+                rows = await cursor.fetchall()
+        
+        schedules = []
+        for row in rows:
+            schedules.append(Schedule(
+                Id=row[0],
+                LectureId=row[1],
+                GroupId=row[2],
+                start_time=row[3],
+                end_time=row[4]
+            ))
         
-        async with self.conn.cursor() as cursor:
-            await cursor.execute(query, (lecture_ids, group_id))
-            rows = await cursor.fetchall()
-            
-            schedules = []
-            for row in rows:
-                schedules.append(Schedule(
-                    Id=row[0],
-                    LectureId=row[1],
-                    GroupId=row[2],
-                    start_time=row[3],
-                    end_time=row[4]
-                ))
-            
-            return schedules
+        return schedules
@@ -40,15 +40,41 @@ class StudentRepository:
         self._log = logging.getLogger(__name__)
 
     async def get_by_ids(self, student_ids: List[int]) -> List[Student]:
-        """Получить студентов по списку ID. Поддерживает hash и JSON хранение."""
+        """
+        Получить студентов по списку ID. Поддерживает hash и JSON хранение.
+        Два round trip'а на весь список: pipeline HGETALL, затем pipeline GET
+        для ключей, которые не являются hash (или отсутствуют).
+        """
         self._log.debug("redis get_by_ids: n=%d", len(student_ids))
+        if not student_ids:
+            return []
+        keys = [f"student:{student_id}" for student_id in student_ids]
+
+        # 1) Основной путь: Hash (как пишет генератор на C#)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.hgetall(key)
+            hashes = await pipe.execute(raise_on_error=False)
+
+        # 2) Fallback: JSON-строка по ключу — только для промахов
+        misses = [
+            index for index, h in enumerate(hashes)
+            if not h or isinstance(h, Exception)
+        ]
+        raw_by_index = {}
+        if misses:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for index in misses:
+                    pipe.get(keys[index])
+                raws = await pipe.execute(raise_on_error=False)
+            raw_by_index = dict(zip(misses, raws))
+
+        # Собираем результат в исходном порядке ID
         students: List[Student] = []
-        for student_id in student_ids:
-            key = f"student:{student_id}"
+        for index, student_id in enumerate(student_ids):
             try:
-                # 1) Основной путь: Hash (как пишет генератор на C#)
-                h = await self.redis.hgetall(key)
-                if h:
+                h = hashes[index]
+                if h and not isinstance(h, Exception):
                     mapped = {
                         "Id": student_id,
                         "FullName": h.get("fio") or h.get("full_name") or "",
@@ -58,8 +84,9 @@ class StudentRepository:
                     students.append(Student(**mapped))
                     continue
 
-                # 2) Fallback: JSON-строка по ключу
-                raw = await self.redis.get(key)
+                raw = raw_by_index.get(index)
+                if isinstance(raw, Exception):
+                    raise raw
                 if raw:
                     student_dict = json.loads(raw)
                     students.append(Student(**student_dict))
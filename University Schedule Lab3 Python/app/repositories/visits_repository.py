@@ -1,61 +1,93 @@
-from psycopg import AsyncConnection
-from typing import List
+from psycopg_pool import AsyncConnectionPool
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
 import logging
 from ..models.lab3_models import Visit
+from ..schema_catalog import SchemaCatalog
+
+# Посещение отмечается во время занятия, которое может начаться у границы периода
+# и закончиться за ней, поэтому окно времени посещений шире периода на эту величину
+VISIT_TIME_SLACK = timedelta(days=1)
+
+
+def _visit_window(period: Tuple[datetime, datetime]) -> Tuple[datetime, datetime]:
+    start, end = period
+    return start - VISIT_TIME_SLACK, end + VISIT_TIME_SLACK
 
 
 class VisitsRepository:
     """Репозиторий для работы с посещениями в PostgreSQL"""
     
-    def __init__(self, conn: AsyncConnection):
-        self.conn = conn
+    def __init__(self, pool: AsyncConnectionPool, catalog: SchemaCatalog):
+        self.pool = pool
+        self.catalog = catalog
         self._log = logging.getLogger(__name__)
     
-    async def _detect_schema(self) -> str:
-        """Определить схему таблицы (PascalCase или snake_case)"""
-        async with self.conn.cursor() as cursor:
-            await cursor.execute("""
-                SELECT column_name FROM information_schema.columns
-                WHERE table_name = 'Visits' AND column_name = 'Id'
-            """)
-            result = await cursor.fetchone()
-            return "pascal" if result else "snake"
-    
     async def get_by_schedule_and_students(
         self, 
         schedule_ids: List[int], 
-        student_ids: List[int]
+        student_ids: List[int],
+        period: Optional[Tuple[datetime, datetime]] = None
     ) -> List[Visit]:
-        """Получить посещения по ID расписаний и студентов"""
+        """Получить посещения по ID расписаний и студентов (только за ``period``, если задан)"""
         if not schedule_ids or not student_ids:
             return []
         
-        schema = await self._detect_schema()
-        self._log.debug("visits schema=%s schedule_ids=%d student_ids=%d", schema, len(schedule_ids), len(student_ids))
+        self._log.debug("visits schedule_ids=%d student_ids=%d", len(schedule_ids), len(student_ids))
+        if period is None:
+            query = await self.catalog.query("visits_by_schedule_and_students")
+            params = (schedule_ids, student_ids)
+        else:
+            query = await self.catalog.query("visits_by_schedule_and_students_in_period")
+            params = (schedule_ids, student_ids, *_visit_window(period))
+        async with self.pool.connection() as conn:
+            async with conn.cursor() as cursor:
+                await cursor.execute(query, params)
+                rows = await cursor.fetchall()
         
-        if schema == "pascal":
-            query = """
-                SELECT "Id", "StudentId", "ScheduleId"
-                FROM "Visits"
-                WHERE "ScheduleId" = ANY(%s) AND "StudentId" = ANY(%s)
-            """
+        visits = []
+        for row in rows:
+            visits.append(Visit(
+                Id=row[0],
+                StudentId=row[1],
+                ScheduleId=row[2]
+            ))
+        
+        return visits
+
+    async def get_attendance_summary(
+        self,
+        lecture_ids: List[int],
+        group_id: int,
+        student_ids: List[int],
+        period: Optional[Tuple[datetime, datetime]] = None
+    ) -> Tuple[int, Dict[int, int]]:
+        """
+        Одним агрегирующим запросом получить число занятий группы по лекциям
+        и число посещений каждого студента (за ``period``, если задан).
+        Возвращает: (scheduled_count, {student_id: visit_count})
+        """
+        if not lecture_ids:
+            return 0, {}
+        
+        self._log.debug("attendance summary lecture_ids=%d group_id=%s student_ids=%d", len(lecture_ids), group_id, len(student_ids))
+        if period is None:
+            query = await self.catalog.query("attendance_summary_by_lecture_and_group")
+            params = (lecture_ids, group_id, student_ids)
         else:
-            query = """
-                SELECT id, student_id, schedule_id
-                FROM visits
-                WHERE schedule_id = ANY(%s) AND student_id = ANY(%s)
-            """
+            query = await self.catalog.query("attendance_summary_by_lecture_and_group_in_period")
+            params = (lecture_ids, group_id, *period, student_ids, *_visit_window(period))
+        async with self.pool.connection() as conn:
+            async with conn.cursor() as cursor:
+                await cursor.execute(query, params)
+                rows = await cursor.fetchall()
+        
+        scheduled_count = 0
+        visits_by_student: Dict[int, int] = {}
+        for student_id, total in rows:
+            if student_id is None:
+                scheduled_count = int(total)
+            else:
+                visits_by_student[student_id] = int(total)
         
-        async with self.conn.cursor() as cursor:
-            await cursor.execute(query, (schedule_ids, student_ids))
-            rows = await cursor.fetchall()
-            
-            visits = []
-            for row in rows:
-                visits.append(Visit(
-                    Id=row[0],
-                    StudentId=row[1],
-                    ScheduleId=row[2]
-                ))
-            
-            return visits
+        return scheduled_count, visits_by_student
@@ -0,0 +1,163 @@
+import asyncio
+import logging
+from typing import Dict, Tuple
+
+from psycopg_pool import AsyncConnectionPool
+
+
+# Таблица -> (имя PascalCase-таблицы, {схема: (SQL-имя таблицы, {поле: SQL-имя колонки})})
+_LAYOUTS: Dict[str, Tuple[str, Dict[str, Tuple[str, Dict[str, str]]]]] = {
+    "courses": ("Courses", {
+        "pascal": ('"Courses"', {
+            "id": '"Id"', "name": '"Name"', "department_id": '"DepartmentId"',
+            "speciality_id": '"SpecialityId"', "term": '"Term"',
+        }),
+        "snake": ("courses", {
+            "id": "id", "name": "name", "department_id": "department_id",
+            "speciality_id": "speciality_id", "term": "term",
+        }),
+    }),
+    "lectures": ("Lectures", {
+        "pascal": ('"Lectures"', {
+            "id": '"Id"', "name": '"Name"', "requirements": '"Requirements"',
+            "year": '"Year"', "course_id": '"CourseId"',
+        }),
+        "snake": ("lectures", {
+            "id": "id", "name": "name", "requirements": "requirements",
+            "year": "year", "course_id": "course_id",
+        }),
+    }),
+    "schedules": ("Schedules", {
+        "pascal": ('"Schedules"', {
+            "id": '"Id"', "lecture_id": '"LectureId"', "group_id": '"GroupId"',
+            "start_time": '"StartTime"', "end_time": '"EndTime"',
+        }),
+        "snake": ("schedules", {
+            "id": "id", "lecture_id": "lecture_id", "group_id": "group_id",
+            "start_time": "start_time", "end_time": "end_time",
+        }),
+    }),
+    "visits": ("Visits", {
+        "pascal": ('"Visits"', {
+            "id": '"Id"', "student_id": '"StudentId"', "schedule_id": '"ScheduleId"',
+            "visit_time": '"VisitTime"',
+        }),
+        "snake": ("visits", {
+            "id": "id", "student_id": "student_id", "schedule_id": "schedule_id",
+            "visit_time": "visit_time",
+        }),
+    }),
+}
+
+
+class SchemaCatalog:
+    """
+    Общий для процесса каталог схемы PostgreSQL.
+
+    Один раз определяет, в каком стиле (PascalCase или snake_case) созданы таблицы,
+    хранит сопоставление колонок и заранее готовит SQL для запросов репозиториев.
+    После миграции схему можно перечитать через ``reload``.
+    """
+
+    def __init__(self, pool: AsyncConnectionPool):
+        self.pool = pool
+        self._schemas: Dict[str, str] = {}
+        self._queries: Dict[str, str] = {}
+        self._lock = asyncio.Lock()
+        self._log = logging.getLogger(__name__)
+
+    async def load(self) -> None:
+        """Определить схему всех таблиц одним запросом и подготовить SQL"""
+        async with self._lock:
+            await self._load()
+
+    async def _load(self) -> None:
+        pascal_names = [pascal for pascal, _ in _LAYOUTS.values()]
+        async with self.pool.connection() as conn:
+            async with conn.cursor() as cursor:
+                await cursor.execute(
+                    """
+                    SELECT DISTINCT table_name FROM information_schema.columns
+                    WHERE table_name = ANY(%s) AND column_name = 'Id'
+                    """,
+                    (pascal_names,)
+                )
+                found = {row[0] for row in await cursor.fetchall()}
+        self._schemas = {
+            table: "pascal" if pascal in found else "snake"
+            for table, (pascal, _) in _LAYOUTS.items()
+        }
+        self._queries = self._render()
+        self._log.info("Schema catalog loaded: %s", self._schemas)
+
+    async def reload(self) -> Dict[str, str]:
+        """Перечитать схему (например, после миграции)"""
+        await self.load()
+        return dict(self._schemas)
+
+    def schema(self, table: str) -> str:
+        return self._schemas[table]
+
+    def columns(self, table: str) -> Dict[str, str]:
+        return _LAYOUTS[table][1][self._schemas[table]][1]
+
+    def table(self, table: str) -> str:
+        return _LAYOUTS[table][1][self._schemas[table]][0]
+
+    async def query(self, name: str) -> str:
+        """Готовый SQL запроса; если каталог еще не загружен (БД была недоступна при старте) — загрузить"""
+        if not self._queries:
+            async with self._lock:
+                if not self._queries:
+                    await self._load()
+        return self._queries[name]
+
+    def _render(self) -> Dict[str, str]:
+        courses, c = self.table("courses"), self.columns("courses")
+        lectures, l = self.table("lectures"), self.columns("lectures")
+        schedules, s = self.table("schedules"), self.columns("schedules")
+        visits, v = self.table("visits"), self.columns("visits")
+        # Варианты *_in_period ограничивают начало занятия и время посещения периодом отчета,
+        # чтобы PostgreSQL отсекал лишние партиции visits
+        sched_period = f" AND {s['start_time']} BETWEEN %s AND %s"
+        visit_period = f" AND {visits}.{v['visit_time']} BETWEEN %s AND %s"
+        queries = {
+            "courses_by_lecture_ids_and_department": (
+                f"SELECT {c['id']}, {c['name']}, {c['department_id']}, {c['speciality_id']}, {c['term']} "
+                f"FROM {courses} "
+                f"WHERE {c['id']} IN (SELECT {l['course_id']} FROM {lectures} WHERE {l['id']} = ANY(%s)) "
+                f"AND {c['department_id']} = %s"
+            ),
+            "lectures_by_course_ids": (
+                f"SELECT {l['id']}, {l['name']}, {l['requirements']}, {l['year']}, {l['course_id']} "
+                f"FROM {lectures} "
+                f"WHERE {l['course_id']} = ANY(%s)"
+            ),
+        }
+        for period in (False, True):
+            suffix = "_in_period" if period else ""
+            sched_filter = sched_period if period else ""
+            visit_filter = visit_period if period else ""
+            queries["schedules_by_lecture_and_group" + suffix] = (
+                f"SELECT {s['id']}, {s['lecture_id']}, {s['group_id']}, {s['start_time']}, {s['end_time']} "
+                f"FROM {schedules} "
+                f"WHERE {s['lecture_id']} = ANY(%s) AND {s['group_id']} = %s{sched_filter}"
+            )
+            queries["visits_by_schedule_and_students" + suffix] = (
+                f"SELECT {v['id']}, {v['student_id']}, {v['schedule_id']} "
+                f"FROM {visits} "
+                f"WHERE {v['schedule_id']} = ANY(%s) AND {v['student_id']} = ANY(%s){visit_filter}"
+            )
+            # Строка с student_id = NULL несет число занятий группы, остальные — посещения по студентам
+            queries["attendance_summary_by_lecture_and_group" + suffix] = (
+                f"WITH sched AS ("
+                f"SELECT {s['id']} AS id FROM {schedules} "
+                f"WHERE {s['lecture_id']} = ANY(%s) AND {s['group_id']} = %s{sched_filter}) "
+                f"SELECT NULL AS student_id, count(*) FROM sched "
+                f"UNION ALL "
+                f"SELECT {v['student_id']}, count(*) FROM {visits} "
+                f"JOIN sched ON sched.id = {visits}.{v['schedule_id']} "
+                f"WHERE {visits}.{v['student_id']} = ANY(%s){visit_filter} "
+                f"GROUP BY {visits}.{v['student_id']}"
+            )
+        return queries
@@ -1,11 +1,17 @@
-from typing import Optional, Dict, List
+from datetime import datetime
+from functools import partial
+from typing import Optional, Dict, List, Tuple
 import logging
 from ..models.lab3_models import (
     GroupReportResponse, 
     CourseDTO, 
     GroupDTO, 
     StudentDTO,
-    Student
+    Student,
+    Group,
+    Course,
+    Lecture,
+    Schedule
 )
 from ..repositories.group_repository import GroupRepository
 from ..repositories.student_repository import StudentRepository
@@ -13,6 +19,15 @@ from ..repositories.course_repository import CourseRepository
 from ..repositories.lecture_repository import LectureRepository
 from ..repositories.schedule_repository import ScheduleRepository
 from ..repositories.visits_repository import VisitsRepository
+from .stage_graph import StageGraph
+
+
+class _ReportAborted(Exception):
+    """Досрочное завершение отчета с сообщением для клиента"""
+
+    def __init__(self, message: str):
+        super().__init__(message)
+        self.message = message
 
 
 class GroupReportService:
@@ -25,7 +40,8 @@ class GroupReportService:
         course_repo: CourseRepository,
         lecture_repo: LectureRepository,
         schedule_repo: ScheduleRepository,
-        visits_repo: VisitsRepository
+        visits_repo: VisitsRepository,
+        aggregate_attendance: bool = True
     ):
         self.group_repo = group_repo
         self.student_repo = student_repo
@@ -33,54 +49,133 @@ class GroupReportService:
         self.lecture_repo = lecture_repo
         self.schedule_repo = schedule_repo
         self.visits_repo = visits_repo
+        self.aggregate_attendance = aggregate_attendance
+        self.stage_timings: Dict[str, float] = {}
         self._log = logging.getLogger(__name__)
     
-    async def get_group_report(self, group_name: str) -> GroupReportResponse:
+    async def get_group_report(
+        self,
+        group_name: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> GroupReportResponse:
         """
-        Получить отчет по группе:
+        Получить отчет по группе. Этапы выполняются как DAG (StageGraph):
         1. Найти группу по имени
         2. Получить студентов и лекции из Neo4j
-        3. Найти специальные курсы (по департаменту)
-        4. Посчитать общие часы (кол-во занятий * 2)
-        5. Посчитать посещенные часы для каждого студента
+        3. Параллельно: студенты из Redis (нужны только student_ids)
+           и специальные курсы (по департаменту, нужны только lecture_ids)
+        4. Лекции курсов -> число занятий и посещений по студентам
+           (одним агрегирующим SQL-запросом при ``aggregate_attendance``,
+           иначе построчно: расписание -> посещения)
+        5. Посчитать общие часы (кол-во занятий * 2) и посещенные часы для каждого студента
+        Если заданы ``start`` и ``end``, учитываются только занятия и посещения за этот период
+        (PostgreSQL при этом читает только нужные партиции visits).
+        Длительность каждого этапа сохраняется в ``stage_timings``.
         """
-        # 1. Найти группу
         self._log.debug("Lab3 start: group_name=%s", group_name)
-        group = await self.group_repo.get_by_name(group_name)
-        self._log.debug("Group lookup -> %s", group.dict() if group else None)
-        if not group:
+        period = (start, end) if start is not None and end is not None else None
+        graph = StageGraph()
+        graph.add("group", lambda: self._load_group(group_name))
+        graph.add("graph", self._load_graph, "group")
+        graph.add("students", self._load_students, "graph")
+        graph.add("courses", self._load_courses, "group", "graph")
+        graph.add("lectures", self._load_lectures, "graph", "courses")
+        if self.aggregate_attendance:
+            graph.add("attendance", partial(self._load_attendance_summary, period=period), "group", "graph", "lectures")
+        else:
+            graph.add("schedules", partial(self._load_schedules, period=period), "group", "lectures")
+            graph.add("attendance", partial(self._load_visits, period=period), "graph", "schedules")
+
+        aborted: Optional[_ReportAborted] = None
+        try:
+            results = await graph.run()
+        except _ReportAborted as error:
+            aborted = error
+        finally:
+            self.stage_timings = dict(graph.timings)
+            self._log.debug("Lab3 stage timings (ms): %s", self.stage_timings)
+
+        if aborted is not None:
             return GroupReportResponse(
                 CourseInfo=None,
                 GroupInfo=None,
-                Message=f"Группа '{group_name}' не найдена"
+                Message=aborted.message
             )
+
+        group = results["group"]
+        courses = results["courses"]
+        filtered_lectures = results["lectures"]
+        students = results["students"]
+        scheduled_count, visits_by_student = results["attendance"]
+
+        # Подсчет общих часов: каждое занятие = 2 часа
+        all_hours = scheduled_count * 2
+        
+        # Создать DTO для студентов
+        student_dtos = []
+        for student in students:
+            visit_count = visits_by_student.get(student.id, 0)
+            visit_hours = visit_count * 2  # каждое посещение = 2 часа
+            
+            student_dtos.append(StudentDTO(
+                student=student,
+                all_hours=all_hours,
+                visit_hours=visit_hours
+            ))
+        
+        # Формируем ответ
+        course_info = CourseDTO(
+            courses=courses,
+            lectures=filtered_lectures
+        )
         
-        # 2. Получить детали из Neo4j (ID студентов и лекций)
+        group_info = GroupDTO(
+            group=group,
+            students=student_dtos
+        )
+        
+        return GroupReportResponse(
+            CourseInfo=course_info,
+            GroupInfo=group_info,
+            Message=None
+        )
+
+    # ===== Этапы отчета =====
+
+    async def _load_group(self, group_name: str) -> Group:
+        group = await self.group_repo.get_by_name(group_name)
+        self._log.debug("Group lookup -> %s", group.dict() if group else None)
+        if not group:
+            raise _ReportAborted(f"Группа '{group_name}' не найдена")
+        return group
+
+    async def _load_graph(self, group: Group) -> Tuple[List[int], List[int]]:
         student_ids, lecture_ids = await self.lecture_repo.get_group_details(group.id)
         self._log.debug("Neo4j -> student_ids=%d, lecture_ids=%d", len(student_ids), len(lecture_ids))
-        
         if not student_ids or not lecture_ids:
-            return GroupReportResponse(
-                CourseInfo=None,
-                GroupInfo=None,
-                Message=f"Нет данных для группы '{group_name}' в Neo4j"
-            )
-        
-        # 3. Получить специальные курсы (по департаменту группы)
+            raise _ReportAborted(f"Нет данных для группы '{group.name}' в Neo4j")
+        return student_ids, lecture_ids
+
+    async def _load_students(self, graph: Tuple[List[int], List[int]]) -> List[Student]:
+        student_ids, _ = graph
+        students = await self.student_repo.get_by_ids(student_ids)
+        self._log.debug("Redis -> students=%d", len(students))
+        return students
+
+    async def _load_courses(self, group: Group, graph: Tuple[List[int], List[int]]) -> List[Course]:
+        _, lecture_ids = graph
         courses = await self.course_repo.get_by_lecture_ids_and_department(
-            lecture_ids, 
+            lecture_ids,
             group.department_id
-            )
+        )
         self._log.debug("PG -> courses=%d; department_id=%s", len(courses), group.department_id)
-                
         if not courses:
-            return GroupReportResponse(
-                CourseInfo=None,
-                GroupInfo=None,
-                Message=f"Нет специальных курсов для департамента {group.department_id}"
-            )
-        
-        # 4. Получить лекции для этих курсов
+            raise _ReportAborted(f"Нет специальных курсов для департамента {group.department_id}")
+        return courses
+
+    async def _load_lectures(self, graph: Tuple[List[int], List[int]], courses: List[Course]) -> List[Lecture]:
+        _, lecture_ids = graph
         course_ids = [course.id for course in courses]
         lectures = await self.lecture_repo.get_by_course_ids(course_ids)
         self._log.debug("PG -> lectures=%d", len(lectures))
@@ -92,70 +187,59 @@ class GroupReportService:
             if lec.id in lecture_ids_set and bool(getattr(lec, "requirements", False))
         ]
         self._log.debug("Filtered lectures (requirements only)=%d", len(filtered_lectures))
-        
         if not filtered_lectures:
-            return GroupReportResponse(
-                CourseInfo=None,
-                GroupInfo=None,
-                Message=f"Нет лекций для специальных курсов"
-            )
-        
-        # 5. Получить расписание для этих лекций
-        filtered_lecture_ids = [lec.id for lec in filtered_lectures]
+            raise _ReportAborted("Нет лекций для специальных курсов")
+        return filtered_lectures
+
+    async def _load_schedules(
+        self,
+        group: Group,
+        lectures: List[Lecture],
+        period: Optional[Tuple[datetime, datetime]] = None
+    ) -> List[Schedule]:
+        filtered_lecture_ids = [lec.id for lec in lectures]
         schedules = await self.schedule_repo.get_by_lecture_and_group(
             filtered_lecture_ids,
-            group.id
-            )
+            group.id,
+            period
+        )
         self._log.debug("PG -> schedules=%d; sample_times=%s", len(schedules), [(getattr(s, "start_time", None), getattr(s, "end_time", None)) for s in schedules[:3]])
-                
-        # Подсчет общих часов: каждое занятие = 2 часа
-        all_hours = len(schedules) * 2
-        
-        # 6. Получить студентов
-        students = await self.student_repo.get_by_ids(student_ids)
-        self._log.debug("Redis -> students=%d", len(students))
-        
-        # 7. Получить посещения
+        return schedules
+
+    async def _load_visits(
+        self,
+        graph: Tuple[List[int], List[int]],
+        schedules: List[Schedule],
+        period: Optional[Tuple[datetime, datetime]] = None
+    ) -> Tuple[int, Dict[int, int]]:
+        student_ids, _ = graph
         schedule_ids = [sched.id for sched in schedules]
         visits = await self.visits_repo.get_by_schedule_and_students(
             schedule_ids,
-            student_ids
-            )
+            student_ids,
+            period
+        )
         self._log.debug("PG -> visits=%d", len(visits))
-                
-        # 8. Подсчитать посещенные часы для каждого студента
+        
         # Группируем посещения по студентам
         visits_by_student: Dict[int, int] = {}
         for visit in visits:
             visits_by_student[visit.student_id] = visits_by_student.get(visit.student_id, 0) + 1
-        
-        # 9. Создать DTO для студентов
-        student_dtos = []
-        for student in students:
-            visit_count = visits_by_student.get(student.id, 0)
-            visit_hours = visit_count * 2  # каждое посещение = 2 часа
-            
-            student_dtos.append(StudentDTO(
-                student=student,
-                all_hours=all_hours,
-                visit_hours=visit_hours
-            ))
-        
-        # 10. Формируем ответ
-        course_info = CourseDTO(
-            courses=courses,
-            lectures=filtered_lectures
-        )
-        
-        group_info = GroupDTO(
-            group=group,
-            students=student_dtos
-        )
-        
-        return GroupReportResponse(
-            CourseInfo=course_info,
-            GroupInfo=group_info,
-            Message=None
-        )
-
+        return len(schedules), visits_by_student
 
+    async def _load_attendance_summary(
+        self,
+        group: Group,
+        graph: Tuple[List[int], List[int]],
+        lectures: List[Lecture],
+        period: Optional[Tuple[datetime, datetime]] = None
+    ) -> Tuple[int, Dict[int, int]]:
+        student_ids, _ = graph
+        scheduled_count, visits_by_student = await self.visits_repo.get_attendance_summary(
+            [lec.id for lec in lectures],
+            group.id,
+            student_ids,
+            period
+        )
+        self._log.debug("PG -> scheduled=%d; students_with_visits=%d", scheduled_count, len(visits_by_student))
+        return scheduled_count, visits_by_student
@@ -0,0 +1,176 @@
+import os
+import re
+from datetime import date, datetime, timedelta
+
+# Имена партиций: visits_p2025_09 (месяц) или visits_p2025w36 (ISO-неделя)
+_MONTH_NAME = re.compile(r"_p(\d{4})_(\d{2})$")
+_WEEK_NAME = re.compile(r"_p(\d{4})w(\d{2})$")
+
+
+def period_start(moment, interval):
+    """Начало периода (месяца или ISO-недели), в который попадает ``moment``"""
+    day = moment.date() if isinstance(moment, datetime) else moment
+    if interval == "month":
+        return day.replace(day=1)
+    return day - timedelta(days=day.weekday())
+
+
+def next_period(start, interval):
+    if interval == "month":
+        return date(start.year + start.month // 12, start.month % 12 + 1, 1)
+    return start + timedelta(weeks=1)
+
+
+def partition_name(table, start, interval):
+    if interval == "month":
+        return f"{table}_p{start.year:04d}_{start.month:02d}"
+    iso_year, iso_week, _ = start.isocalendar()
+    return f"{table}_p{iso_year:04d}w{iso_week:02d}"
+
+
+def parse_partition_name(table, name, interval):
+    """Начало периода по имени партиции; None для партиций, созданных не менеджером"""
+    if not name.startswith(table):
+        return None
+    suffix = name[len(table):]
+    if interval == "month":
+        match = _MONTH_NAME.fullmatch(suffix)
+        return date(int(match[1]), int(match[2]), 1) if match else None
+    match = _WEEK_NAME.fullmatch(suffix)
+    return date.fromisocalendar(int(match[1]), int(match[2]), 1) if match else None
+
+
+class PartitionManager:
+    """
+    Партиции таблицы, разбитой по диапазонам времени (``PARTITION BY RANGE (column)``).
+
+    Партиции — по месяцам или ISO-неделям, создаются по требованию (``ensure_range``
+    перед загрузкой данных) и заранее на ``premake`` периодов вперед (``maintain``).
+    Партиции старше ``retention`` периодов отсоединяются (DETACH ... CONCURRENTLY, без
+    блокировки чтения) и переносятся в схему ``archive_schema``; без схемы — удаляются.
+    Таблица по умолчанию (DEFAULT) не создается: она запрещает DETACH CONCURRENTLY.
+    """
+
+    def __init__(
+        self,
+        table="visits",
+        column='"visitTime"',
+        interval=None,
+        premake=None,
+        retention=None,
+        archive_schema=None,
+    ):
+        self.table = table
+        self.column = column
+        self.interval = interval or os.getenv("POSTGRES_VISITS_PARTITION_INTERVAL", "month")
+        if self.interval not in ("month", "week"):
+            raise ValueError("interval must be 'month' or 'week'")
+        self.premake = premake if premake is not None else int(os.getenv("POSTGRES_VISITS_PARTITION_PREMAKE", "3"))
+        # 0 — хранить все партиции
+        self.retention = retention if retention is not None else int(os.getenv("POSTGRES_VISITS_PARTITION_RETENTION", "0"))
+        self.archive_schema = (
+            archive_schema if archive_schema is not None
+            else os.getenv("POSTGRES_VISITS_ARCHIVE_SCHEMA", "archive")
+        )
+
+    async def partition_key(self, conn):
+        """
+        Ключ партиционирования таблицы (например, 'RANGE ("visitTime")'); пустая строка для
+        непартиционированной таблицы, None — если таблицы нет
+        """
+        return await conn.fetchval(
+            "SELECT CASE WHEN to_regclass($1) IS NOT NULL "
+            "THEN COALESCE(pg_get_partkeydef(to_regclass($1)), '') END",
+            self.table,
+        )
+
+    async def is_legacy(self, conn):
+        """Таблица существует, но разбита не по ``column`` (например, по week_number в старой схеме)"""
+        key = await self.partition_key(conn)
+        return key is not None and key != f"RANGE ({self.column})"
+
+    async def _require_managed(self, conn):
+        key = await self.partition_key(conn)
+        if key is not None and key != f"RANGE ({self.column})":
+            raise RuntimeError(
+                f"{self.table} is partitioned by {key or 'nothing'}, expected RANGE ({self.column}); "
+                f"run create_tables to migrate it"
+            )
+
+    async def ensure_range(self, conn, start, end):
+        """Создать недостающие партиции, покрывающие [start, end]. Возвращает имена созданных"""
+        await self._require_managed(conn)
+        existing = set(await self._partitions(conn))
+        created = []
+        current = period_start(start, self.interval)
+        last = period_start(end, self.interval)
+        while current <= last:
+            name = partition_name(self.table, current, self.interval)
+            if name not in existing:
+                upper = next_period(current, self.interval)
+                await conn.execute(
+                    f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {self.table} "
+                    f"FOR VALUES FROM ('{current.isoformat()}') TO ('{upper.isoformat()}')"
+                )
+                created.append(name)
+            current = next_period(current, self.interval)
+        return created
+
+    async def detach_expired(self, conn, now=None):
+        """Отсоединить и архивировать партиции старше ``retention`` периодов. Возвращает их имена"""
+        if self.retention <= 0:
+            return []
+        cutoff = period_start(now or datetime.now(), self.interval)
+        for _ in range(self.retention):
+            cutoff = self._previous_period(cutoff)
+
+        expired = []
+        for name in await self._partitions(conn):
+            start = parse_partition_name(self.table, name, self.interval)
+            if start is not None and next_period(start, self.interval) <= cutoff:
+                expired.append(name)
+
+        if expired and self.archive_schema:
+            await conn.execute(f"CREATE SCHEMA IF NOT EXISTS {self.archive_schema}")
+        for name in sorted(expired):
+            # CONCURRENTLY нельзя выполнять внутри транзакции
+            await conn.execute(f"ALTER TABLE {self.table} DETACH PARTITION {name} CONCURRENTLY")
+            if self.archive_schema:
+                await conn.execute(f"ALTER TABLE {name} SET SCHEMA {self.archive_schema}")
+            else:
+                await conn.execute(f"DROP TABLE {name}")
+        return sorted(expired)
+
+    async def maintain(self, conn, now=None):
+        """
+        Создать партиции на ``premake`` периодов вперед и архивировать устаревшие.
+        Таблица со старым ключом партиционирования не трогается (``skipped`` в результате).
+        """
+        key = await self.partition_key(conn)
+        if key is None:
+            return {"created": [], "detached": []}
+        if key != f"RANGE ({self.column})":
+            return {"created": [], "detached": [], "skipped": f"{self.table} is partitioned by {key or 'nothing'}"}
+        now = now or datetime.now()
+        end = period_start(now, self.interval)
+        for _ in range(self.premake):
+            end = next_period(end, self.interval)
+        created = await self.ensure_range(conn, now, end)
+        detached = await self.detach_expired(conn, now)
+        return {"created": created, "detached": detached}
+
+    async def _partitions(self, conn):
+        rows = await conn.fetch(
+            """
+            SELECT c.relname FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = to_regclass($1)
+            """,
+            self.table,
+        )
+        return [row["relname"] for row in rows]
+
+    def _previous_period(self, start):
+        if self.interval == "month":
+            return (start - timedelta(days=1)).replace(day=1)
+        return start - timedelta(weeks=1)
@@ -1,11 +1,16 @@
 from redis.asyncio import Redis
 import json
+import os
+
+STUDENT_KEYS = "student:*"  # Ключи согласно схеме student:1
 
 
 class RedisHandler:
-    def __init__(self, host="redis", port=6379):
+    def __init__(self, host="redis", port=6379, scan_count=None):
         # создаём экземпляр Redis-клиента
         self.redis = Redis(host=host, port=port, decode_responses=True)
+        # Подсказка COUNT для SCAN: сколько ключей Redis просматривает за один шаг
+        self.scan_count = scan_count if scan_count is not None else int(os.getenv("REDIS_SCAN_COUNT", "1000"))
 
     async def save_student(self, key, student):
         """Создание/обновление студента по ключу (зачетная книжка) используя HMSET согласно схеме"""
@@ -24,16 +29,52 @@ class RedisHandler:
         val = await self.redis.hgetall(key)
         return val if val else None
 
+    async def scan_students_page(self, cursor=0, count=None, limit=None):
+        """
+        Одна страница студентов для пагинации по курсору: SCAN продолжается с ``cursor``,
+        пока не набрано ``limit`` студентов (по умолчанию ``count``) или обход не закончен.
+        Возвращает (next_cursor, students); next_cursor == 0 — студентов больше нет.
+        Если задан только ``limit``, подсказка COUNT не больше ``limit``, чтобы страница
+        была близка к запрошенному размеру; SCAN все равно может вернуть чуть больше ключей.
+        """
+        if count is None:
+            count = min(limit, self.scan_count) if limit else self.scan_count
+        limit = limit or count
+        students = []
+        while True:
+            cursor, page = await self._scan_page(cursor, count)
+            students.extend(page)
+            if cursor == 0 or len(students) >= limit:
+                return cursor, students
+
+    async def iter_students(self, count=None):
+        """Все студенты потоком: SCAN (без блокировки Redis, в отличие от KEYS) и HGETALL страницы одним pipeline"""
+        cursor = 0
+        while True:
+            cursor, page = await self._scan_page(cursor, count or self.scan_count)
+            for student in page:
+                yield student
+            if cursor == 0:
+                return
+
     async def get_all_students(self):
         """Получение всех студентов"""
-        keys = await self.redis.keys("student:*")  # Ключи согласно схеме student:1
+        return [student async for student in self.iter_students()]
+
+    async def _scan_page(self, cursor, count):
+        cursor, keys = await self.redis.scan(cursor=cursor, match=STUDENT_KEYS, count=count, _type="hash")
+        if not keys:
+            return cursor, []
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.hgetall(key)
+            values = await pipe.execute()
         students = []
-        for key in keys:
-            student = await self.get_student(key)
-            if student:
+        for key, student in zip(keys, values):
+            if student:  # ключ мог быть удален между SCAN и HGETALL
                 student["key"] = key  # Добавляем ключ для идентификации
                 students.append(student)
-        return students
+        return cursor, students
 
     async def update_student(self, key, updated_data):
         """Обновление данных студента (используя HSET для отдельных полей)"""
@@ -60,12 +101,16 @@ class RedisHandler:
         result = await self.redis.delete(key)
         return result > 0
 
-    async def delete_all_students(self):
-        """Удаление всех студентов"""
-        keys = await self.redis.keys("student:*")
-        if keys:
-            return await self.redis.delete(*keys)
-        return 0
+    async def delete_all_students(self, count=None):
+        """Удаление всех студентов: ключи из SCAN удаляются пачками через UNLINK (память освобождается в фоне)"""
+        deleted = 0
+        cursor = 0
+        while True:
+            cursor, keys = await self.redis.scan(cursor=cursor, match=STUDENT_KEYS, count=count or self.scan_count)
+            if keys:
+                deleted += await self.redis.unlink(*keys)
+            if cursor == 0:
+                return deleted
 
     async def check_connection(self):
         """Проверка доступности Redis"""
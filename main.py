@@ -1,14 +1,56 @@
-from fastapi import FastAPI, HTTPException
+import asyncio
+import json
+import logging
+import os
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from services.generator import DataGenerator
 
+generator = DataGenerator()
+logger = logging.getLogger(__name__)
+
+PARTITION_MAINTENANCE_SECONDS = float(os.getenv("POSTGRES_VISITS_PARTITION_MAINTENANCE_SECONDS", "3600"))
+
+
+async def maintain_partitions_forever():
+    """Периодически создавать партиции visits заранее и архивировать устаревшие"""
+    while True:
+        try:
+            result = await generator.postgres.maintain_partitions()
+            if "skipped" in result:
+                logger.warning("visits partition maintenance skipped: %s; run create_tables to migrate", result["skipped"])
+            elif result["created"] or result["detached"]:
+                logger.info("visits partitions: %s", result)
+        except Exception:
+            logger.exception("visits partition maintenance failed")
+        await asyncio.sleep(PARTITION_MAINTENANCE_SECONDS)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Пул PostgreSQL создается при старте и закрывается при остановке
+    await generator.postgres.get_pool()
+    maintenance = asyncio.create_task(maintain_partitions_forever())
+    try:
+        yield
+    finally:
+        maintenance.cancel()
+        try:
+            await maintenance
+        except asyncio.CancelledError:
+            pass
+        await generator.postgres.close()
+
+
 app = FastAPI(
     title="ScheduleApp - Database Management System",
     description="Система для работы с различными типами баз данных: PostgreSQL, Redis, MongoDB, Neo4j, Elasticsearch",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
-generator = DataGenerator()
-
 @app.get("/")
 async def root():
     return {
@@ -76,11 +118,33 @@ async def cleanup_data():
 
 # Специфические эндпоинты для каждой службы
 
+@app.post("/postgres/partitions/maintain")
+async def maintain_visits_partitions():
+    """Создать партиции visits заранее и архивировать устаревшие, не дожидаясь планового запуска"""
+    try:
+        return await generator.postgres.maintain_partitions()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.get("/redis/students")
-async def get_all_redis_students():
-    """Получение всех студентов из Redis"""
-    students = await generator.redis.get_all_students()
-    return {"students": students, "count": len(students)}
+async def get_all_redis_students(
+    cursor: int = Query(0, ge=0, description="Курсор SCAN из next_cursor предыдущей страницы"),
+    limit: int = Query(1000, ge=1, le=10000, description="Примерный размер страницы"),
+    format: str = Query("json", pattern="^(json|ndjson)$", description="ndjson — все студенты потоком, по одному на строку"),
+):
+    """
+    Студенты из Redis без KEYS: страница по курсору (next_cursor == 0 — последняя страница)
+    или, при format=ndjson, весь список потоком без накопления в памяти
+    """
+    if format == "ndjson":
+        async def lines():
+            async for student in generator.redis.iter_students():
+                yield json.dumps(student, ensure_ascii=False) + "\n"
+
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    next_cursor, students = await generator.redis.scan_students_page(cursor, limit=limit)
+    return {"students": students, "count": len(students), "next_cursor": next_cursor}
 
 @app.get("/redis/student/{record_book}")
 async def get_redis_student(record_book: str):